@@ -0,0 +1,351 @@
+"""
+Synthetic scaling benchmarks for Onboard Manager.
+
+Runs the coordinator, platforms and notify dispatch against a Home Assistant
+core instance with a fake auth store and stub notify services, for a range
+of roster sizes, and writes the timings to a JSON file that can be diffed
+between runs.
+
+Requires Home Assistant to be installed (a development environment).
+
+Usage:
+    python benchmarks/bench_onboard_manager.py
+    python benchmarks/bench_onboard_manager.py --sizes 10,1000 --output before.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import dataclass, field, replace
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant, ServiceCall  # noqa: E402
+
+from custom_components.onboard_manager.const import (  # noqa: E402
+    ATTR_PRIORITY,
+    CONF_DUPLICATE_WINDOW,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    DOMAIN,
+    PRIORITY_CRITICAL,
+    SERVICE_EXPORT_STATE,
+)
+from custom_components.onboard_manager.coordinator import (  # noqa: E402
+    OnboardManagerCoordinator,
+)
+from custom_components.onboard_manager.dispatch import (  # noqa: E402
+    GROUP_ALL,
+    NotifyDispatcher,
+)
+from custom_components.onboard_manager.models import (  # noqa: E402
+    RoleCatalog,
+    UserRecord,
+)
+from custom_components.onboard_manager.notify import UserNotifyEntity  # noqa: E402
+from custom_components.onboard_manager.select import RoleSelect  # noqa: E402
+from custom_components.onboard_manager.sensor import (  # noqa: E402
+    OnboardUserNotifiersSensor,
+)
+from custom_components.onboard_manager.services import (  # noqa: E402
+    register_services,
+)
+from custom_components.onboard_manager.storage import (  # noqa: E402
+    DeadLetterStore,
+    OnboardStorage,
+)
+from custom_components.onboard_manager.switch import (  # noqa: E402
+    NotifySwitch,
+    OnboardSwitch,
+)
+from custom_components.onboard_manager.user_registry import (  # noqa: E402
+    ActiveNotifierIndex,
+    sync_users,
+)
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+DEFAULT_FANOUT_LIMIT = 10_000
+ROLES = [
+    {"label": "Crew", "slug": "crew"},
+    {"label": "Passenger", "slug": "passenger"},
+    {"label": "Guest", "slug": "guest"},
+]
+NOTIFIERS_PER_USER = 2
+
+
+@dataclass
+class FakeUser:
+    """Minimal stand-in for homeassistant.auth.models.User."""
+
+    id: str
+    name: str
+    system_generated: bool = False
+    is_active: bool = True
+
+
+class FakeAuth:
+    """Minimal stand-in for the Home Assistant auth manager."""
+
+    def __init__(self, users: list[FakeUser]) -> None:
+        """Initialize with a fixed set of users."""
+        self._users = {user.id: user for user in users}
+
+    async def async_get_users(self) -> list[FakeUser]:
+        """Return all users."""
+        return list(self._users.values())
+
+    async def async_get_user(self, user_id: str) -> FakeUser | None:
+        """Return a user by ID."""
+        return self._users.get(user_id)
+
+
+@dataclass
+class FakeConfigEntry:
+    """Minimal stand-in for a config entry."""
+
+    entry_id: str = "bench"
+    options: dict[str, Any] = field(default_factory=dict)
+
+    def async_create_background_task(
+        self, hass: HomeAssistant, target: Coroutine[Any, Any, Any], name: str
+    ) -> asyncio.Task[Any]:
+        """Create a background task like ConfigEntry does."""
+        return hass.async_create_background_task(target, name)
+
+
+def make_roster(size: int) -> tuple[list[FakeUser], dict[str, UserRecord]]:
+    """Generate auth users and their stored records.
+
+    Every other user is onboard, every fifth has notifications disabled, and
+    notifiers are shared by pairs of users to exercise deduplication.
+    """
+    auth_users: list[FakeUser] = []
+    records: dict[str, UserRecord] = {}
+    for i in range(size):
+        user_id = f"{i:032x}"
+        name = f"User {i}"
+        auth_users.append(FakeUser(user_id, name))
+        records[user_id] = UserRecord(
+            user_id=user_id,
+            name=name,
+            onboard=i % 2 == 0,
+            notify=i % 5 != 0,
+            role=ROLES[i % len(ROLES)]["slug"],
+            notifiers=tuple(
+                f"notify.bench_{(i // 2) * NOTIFIERS_PER_USER + n}"
+                for n in range(NOTIFIERS_PER_USER)
+            ),
+        )
+    return auth_users, records
+
+
+async def measure(
+    func: Callable[[], Awaitable[Any] | Any], repeat: int
+) -> dict[str, float]:
+    """Time a (sync or async) callable and return summary statistics."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "runs": repeat,
+    }
+
+
+async def bench_size(
+    size: int, repeat: int, fanout_limit: int, config_dir: str
+) -> list[dict[str, Any]]:
+    """Run all benchmarks for one roster size."""
+    hass = HomeAssistant(config_dir)
+    auth_users, records = make_roster(size)
+    hass.auth = FakeAuth(auth_users)
+    # Rate limiting and duplicate suppression disabled, so repeated fan-outs
+    # measure dispatch overhead
+    config_entry = FakeConfigEntry(
+        options={CONF_RATE_LIMIT: 0, CONF_DUPLICATE_WINDOW: 0}
+    )
+    results: list[dict[str, Any]] = []
+
+    async def record(name: str, func: Callable[[], Any], runs: int = repeat) -> None:
+        stats = await measure(func, runs)
+        results.append({"benchmark": name, "users": size, **stats})
+        print(f"{name:<28} users={size:<7} median={stats['median'] * 1000:10.3f} ms")
+
+    # User sync against the auth store
+    role_catalog = RoleCatalog.from_roles(ROLES)
+    await record("sync_users", lambda: sync_users(hass, records, role_catalog))
+
+    # Aggregates built from scratch, and a single user toggled
+    await record("aggregates_full", lambda: ActiveNotifierIndex().sync(records))
+    index = ActiveNotifierIndex()
+    index.sync(records)
+    first_user_id = next(iter(records))
+
+    def toggle_one() -> None:
+        user = records[first_user_id]
+        index.update_user(first_user_id, replace(user, onboard=not user.onboard))
+        index.update_user(first_user_id, user)
+
+    await record("aggregates_single_user", toggle_one)
+
+    # Full coordinator refresh
+    storage = OnboardStorage(hass, config_entry.entry_id)
+    storage.update_data({"roles": ROLES, "users": dict(records)})
+    coordinator = OnboardManagerCoordinator(hass, config_entry, storage)
+    await record("coordinator_update_data", coordinator._async_update_data)
+    await record("storage_serialize", storage._serialize_for_save)
+    await record("coordinator_restore", coordinator.async_restore)
+    coordinator.data = await coordinator._async_update_data()
+
+    # Single user edit through the delta path
+    async def update_user() -> None:
+        user = coordinator.data["users"][first_user_id]
+        await coordinator.async_update_user(
+            first_user_id, {"onboard": not user.onboard}
+        )
+
+    await record("coordinator_update_user", update_user)
+
+    # Attribute updates of all per-user entities
+    dispatcher = NotifyDispatcher(
+        hass, config_entry, DeadLetterStore(hass, config_entry.entry_id)
+    )
+    entities = []
+    for user_id in coordinator.data["users"]:
+        entities.extend(
+            [
+                OnboardSwitch(coordinator, config_entry, user_id),
+                NotifySwitch(coordinator, config_entry, user_id),
+                RoleSelect(coordinator, config_entry, user_id),
+                OnboardUserNotifiersSensor(coordinator, config_entry, user_id),
+                UserNotifyEntity(coordinator, config_entry, dispatcher, user_id),
+            ]
+        )
+
+    def update_entities() -> None:
+        for entity in entities:
+            entity._update_attrs()
+
+    await record("entity_update_attrs", update_entities)
+
+    # export_state service round trip
+    hass.data[DOMAIN] = {
+        config_entry.entry_id: {"coordinator": coordinator, "dispatcher": dispatcher}
+    }
+    register_services(hass)
+    await record(
+        "export_state",
+        lambda: hass.services.async_call(
+            DOMAIN, SERVICE_EXPORT_STATE, {}, blocking=True, return_response=True
+        ),
+    )
+    await record(
+        "export_state_filtered",
+        lambda: hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_STATE,
+            {"role": "crew", "onboard": True, "fields": ["name"], "limit": 100},
+            blocking=True,
+            return_response=True,
+        ),
+    )
+
+    # Fan-out to all active notifiers through stub notify services
+    if size <= fanout_limit:
+        notifiers = coordinator.data["active_notifiers_all"]
+
+        async def stub_notify(call: ServiceCall) -> None:
+            await asyncio.sleep(0)
+
+        for notifier in notifiers:
+            hass.services.async_register("notify", notifier[7:], stub_notify)
+
+        # Critical messages are delivered directly
+        await record(
+            "notify_fan_out_all",
+            lambda: dispatcher.async_send(
+                GROUP_ALL,
+                notifiers,
+                "Benchmark",
+                data={ATTR_PRIORITY: PRIORITY_CRITICAL},
+            ),
+            runs=max(1, repeat // 2),
+        )
+
+        # With a rate limit, normal messages go through the per-notifier queues;
+        # the limit is high enough that no message waits for a token
+        config_entry.options[CONF_RATE_LIMIT] = 10**9
+        config_entry.options[CONF_RATE_BURST] = 10**9
+
+        async def queued_fan_out() -> None:
+            await dispatcher.async_send(GROUP_ALL, notifiers, "Benchmark")
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        await record("notify_queue_all", queued_fan_out, runs=max(1, repeat // 2))
+
+    await hass.async_stop(force=True)
+    return results
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the benchmarks and write the results."""
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        for size in args.sizes:
+            results.extend(
+                await bench_size(size, args.repeat, args.fanout_limit, config_dir)
+            )
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated roster sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per benchmark (default: 5)"
+    )
+    parser.add_argument(
+        "--fanout-limit",
+        type=int,
+        default=DEFAULT_FANOUT_LIMIT,
+        help="Largest roster size for the notify fan-out benchmark",
+    )
+    parser.add_argument(
+        "--output",
+        default="bench_results.json",
+        help="Machine-readable results file (default: %(default)s)",
+    )
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,127 @@
 """The Onboard Manager integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
+from homeassistant.auth import EVENT_USER_ADDED, EVENT_USER_REMOVED, EVENT_USER_UPDATED
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-
-from .const import DOMAIN, PLATFORMS
-from .coordinator import OnboardManagerCoordinator
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.start import async_at_started
+
+from .const import (
+    CONF_SAVE_DELAY,
+    CONF_SPLIT_STORAGE,
+    DEFAULT_SAVE_DELAY_SECONDS,
+    DEFAULT_SPLIT_STORAGE,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_SET_USER,
+)
+from .coordinator import OnboardManagerCoordinator, sync_interval_from_options
+from .dispatch import NotifyDispatcher
+from .metrics import PhaseTimer
 from .services import register_services, unregister_services
-from .storage import OnboardStorage
+from .storage import DeadLetterStore, OnboardStorage
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Onboard Manager from a config entry."""
-    # Initialize storage
-    storage = OnboardStorage(hass)
-    await storage.async_load()
+    timer = PhaseTimer()
+
+    # Initialize storage; the first entry takes over the storage of versions
+    # without multi-entry support
+    save_delay = entry.options.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY_SECONDS)
+    migrate_legacy = (
+        hass.config_entries.async_entries(DOMAIN)[0].entry_id == entry.entry_id
+    )
+    storage = OnboardStorage(
+        hass,
+        entry.entry_id,
+        save_delay,
+        entry.options.get(CONF_SPLIT_STORAGE, DEFAULT_SPLIT_STORAGE),
+        migrate_legacy,
+    )
+    dead_letters = DeadLetterStore(hass, entry.entry_id, save_delay, migrate_legacy)
+    await asyncio.gather(storage.async_load(), dead_letters.async_load())
+    timer.mark("storage_load")
 
     # Get roles from config entry
     roles = entry.data.get("roles", [])
 
-    # Initialize storage with roles if not already present
-    if not storage.get_roles():
-        storage.set_roles(roles)
-        await storage.async_save()
-    else:
-        # Update roles from config entry (in case they changed via options flow)
+    # Sync roles from config entry (in case they changed via options flow)
+    if storage.get_roles() != roles:
         storage.set_roles(roles)
-        await storage.async_save()
+        storage.async_schedule_save()
 
     # Create coordinator
-    coordinator = OnboardManagerCoordinator(hass, storage)
-
-    # Perform initial data fetch
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = OnboardManagerCoordinator(
+        hass,
+        entry,
+        storage,
+        sync_interval_from_options(entry.options),
+    )
+
+    # Publish the stored snapshot, so entities and notify groups are usable
+    # right away
+    cached_aggregates = coordinator.async_restore()
+    timer.mark("restore")
+
+    # Apply Home Assistant user changes as they happen
+    for event_type in (EVENT_USER_ADDED, EVENT_USER_UPDATED, EVENT_USER_REMOVED):
+        entry.async_on_unload(
+            hass.bus.async_listen(event_type, coordinator.async_handle_user_event)
+        )
+
+    # Shared delivery engine for all notify groups of this entry
+    dispatcher = NotifyDispatcher(hass, entry, dead_letters)
 
     # Store coordinator and storage
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "storage": storage,
+        "dead_letters": dead_letters,
+        "dispatcher": dispatcher,
         "notify_services": [],  # Track registered notify services for cleanup
+        "setup": {"cached_aggregates": cached_aggregates},
     }
 
+    # Make sure pending writes (and retries) hit the disk before Home
+    # Assistant stops
+    async def _async_flush_on_stop(event: Event) -> None:
+        dispatcher.async_shutdown()
+        await storage.async_flush()
+        await dead_letters.async_flush()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_flush_on_stop)
+    )
+
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    timer.mark("platforms")
+
+    # Sync users with Home Assistant in the background once it has started
+    @callback
+    def _async_sync_users(hass: HomeAssistant) -> None:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} user sync"
+        )
 
-    # Register services (only once, on first setup)
-    if len(hass.data[DOMAIN]) == 1:
-        register_services(hass, coordinator)
+    entry.async_on_unload(async_at_started(hass, _async_sync_users))
 
+    # Register services (only once, by the first entry to get here; entries
+    # set up concurrently can't rely on counting hass.data); calls are routed
+    # to the entry given in the call
+    if not hass.services.has_service(DOMAIN, SERVICE_SET_USER):
+        register_services(hass)
+    timer.mark("services")
+
+    hass.data[DOMAIN][entry.entry_id]["setup"].update(timer.as_dict())
     _LOGGER.info("Onboard Manager integration setup complete")
 
     return True
@@ -72,6 +141,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 hass.services.async_remove("notify", service_name)
                 _LOGGER.debug(f"Unregistered legacy notify service: notify.{service_name}")
         
+        # Stop queued notification deliveries
+        if "dispatcher" in entry_data:
+            entry_data["dispatcher"].async_shutdown()
+
+        # Write any pending changes before dropping the storage
+        if "storage" in entry_data:
+            await entry_data["storage"].async_flush()
+        if "dead_letters" in entry_data:
+            await entry_data["dead_letters"].async_flush()
+
         # Remove config entry data
         hass.data[DOMAIN].pop(entry.entry_id)
 
@@ -80,3 +159,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             unregister_services(hass)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the storage of a deleted config entry."""
+    await OnboardStorage(hass, entry.entry_id).async_remove()
+    await DeadLetterStore(hass, entry.entry_id).async_remove()
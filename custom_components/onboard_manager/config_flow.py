@@ -11,7 +11,26 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN
+from .const import (
+    CONF_DUPLICATE_WINDOW,
+    CONF_MAX_PARALLEL_SENDS,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    CONF_SAVE_DELAY,
+    CONF_SEND_TIMEOUT,
+    CONF_SPLIT_STORAGE,
+    CONF_SYNC_INTERVAL,
+    DEFAULT_DUPLICATE_WINDOW_SECONDS,
+    DEFAULT_MAX_PARALLEL_SENDS,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT_PER_MINUTE,
+    DEFAULT_SAVE_DELAY_SECONDS,
+    DEFAULT_SEND_TIMEOUT_SECONDS,
+    DEFAULT_SPLIT_STORAGE,
+    DEFAULT_SYNC_INTERVAL_MINUTES,
+    DOMAIN,
+)
+from .coordinator import sync_interval_from_options
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -68,9 +87,10 @@ class OnboardManagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if not roles:
                 errors["roles"] = "no_roles"
             else:
-                # Create the config entry
+                # Create the config entry; several entries (e.g. one per
+                # vessel) are told apart by their name
                 return self.async_create_entry(
-                    title="Onboard Manager",
+                    title=user_input.get("name") or "Onboard Manager",
                     data={"roles": roles},
                 )
 
@@ -78,6 +98,7 @@ class OnboardManagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=vol.Schema(
                 {
+                    vol.Optional("name", default="Onboard Manager"): str,
                     vol.Required("roles", default="Crew, Passenger, Guest"): str,
                 }
             ),
@@ -119,24 +140,80 @@ class OnboardManagerOptionsFlow(config_entries.OptionsFlow):
                     data={"roles": roles},
                 )
 
+                options = {
+                    key: value for key, value in user_input.items() if key != "roles"
+                }
+                save_delay = options[CONF_SAVE_DELAY]
+
                 # Trigger coordinator update via the integration
                 if DOMAIN in self.hass.data:
                     entry_data = self.hass.data[DOMAIN].get(self.config_entry.entry_id)
+                    if entry_data and "storage" in entry_data:
+                        entry_data["storage"].save_delay = save_delay
+                        await entry_data["storage"].async_set_split_sections(
+                            options[CONF_SPLIT_STORAGE]
+                        )
+                    if entry_data and "dead_letters" in entry_data:
+                        entry_data["dead_letters"].save_delay = save_delay
                     if entry_data and "coordinator" in entry_data:
                         coordinator = entry_data["coordinator"]
+                        coordinator.update_interval = sync_interval_from_options(
+                            options
+                        )
                         await coordinator.async_update_roles(roles)
 
-                return self.async_create_entry(title="", data={})
+                return self.async_create_entry(title="", data=options)
 
         # Get current roles
         current_roles = self.config_entry.data.get("roles", [])
         current_roles_str = roles_to_string(current_roles)
+        options = self.config_entry.options
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
                 {
                     vol.Required("roles", default=current_roles_str): str,
+                    vol.Required(
+                        CONF_SAVE_DELAY,
+                        default=options.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY_SECONDS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_SPLIT_STORAGE,
+                        default=options.get(CONF_SPLIT_STORAGE, DEFAULT_SPLIT_STORAGE),
+                    ): bool,
+                    vol.Required(
+                        CONF_MAX_PARALLEL_SENDS,
+                        default=options.get(
+                            CONF_MAX_PARALLEL_SENDS, DEFAULT_MAX_PARALLEL_SENDS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Required(
+                        CONF_SEND_TIMEOUT,
+                        default=options.get(CONF_SEND_TIMEOUT, DEFAULT_SEND_TIMEOUT_SECONDS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+                    vol.Required(
+                        CONF_RATE_LIMIT,
+                        default=options.get(
+                            CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT_PER_MINUTE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                    vol.Required(
+                        CONF_RATE_BURST,
+                        default=options.get(CONF_RATE_BURST, DEFAULT_RATE_BURST),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                    vol.Required(
+                        CONF_DUPLICATE_WINDOW,
+                        default=options.get(
+                            CONF_DUPLICATE_WINDOW, DEFAULT_DUPLICATE_WINDOW_SECONDS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_SYNC_INTERVAL,
+                        default=options.get(
+                            CONF_SYNC_INTERVAL, DEFAULT_SYNC_INTERVAL_MINUTES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
                 }
             ),
             errors=errors,
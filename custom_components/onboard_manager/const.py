@@ -5,12 +5,63 @@ DOMAIN = "onboard_manager"
 # Platforms
 PLATFORMS = ["sensor", "switch", "select", "notify"]
 
-# Storage
+# Storage, one set of documents per config entry: f"{STORAGE_KEY}.{entry_id}"
 STORAGE_KEY = "onboard_manager"
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
+# Roles are kept in their own document when storage is split by section
+ROLES_STORAGE_KEY = f"{STORAGE_KEY}.roles"
+ROLES_STORAGE_VERSION = 1
+CONF_SPLIT_STORAGE = "split_storage"
+DEFAULT_SPLIT_STORAGE = False
 
-# Update interval
-UPDATE_INTERVAL_SECONDS = 300  # 5 minutes
+# Write-behind persistence
+CONF_SAVE_DELAY = "save_delay"
+DEFAULT_SAVE_DELAY_SECONDS = 10
+
+# Notification fan-out
+CONF_MAX_PARALLEL_SENDS = "max_parallel_sends"
+CONF_SEND_TIMEOUT = "send_timeout"
+DEFAULT_MAX_PARALLEL_SENDS = 10
+DEFAULT_SEND_TIMEOUT_SECONDS = 10
+
+# Outbound queue: token bucket per notifier
+CONF_RATE_LIMIT = "rate_limit"
+CONF_RATE_BURST = "rate_burst"
+DEFAULT_RATE_LIMIT_PER_MINUTE = 0  # 0 disables rate limiting and the queue
+DEFAULT_RATE_BURST = 5
+MAX_QUEUED_PER_NOTIFIER = 100
+
+# Message priority, passed as data: {onboard_priority: ...}; removed from the
+# data before delivery, so it can't clash with the notifiers' own keys (like
+# the companion app's priority)
+ATTR_PRIORITY = "onboard_priority"
+PRIORITY_CRITICAL = "critical"  # Bypasses the rate limit and the queue
+PRIORITY_NORMAL = "normal"
+PRIORITY_INFO = "info"  # Sent after normal messages, dropped first when full
+
+# Duplicate suppression per (notifier, priority, title, message, target, data)
+CONF_DUPLICATE_WINDOW = "duplicate_window"
+DEFAULT_DUPLICATE_WINDOW_SECONDS = 0  # 0 disables suppression
+MAX_RECENT_MESSAGES = 1000
+
+# Failed deliveries are retried with exponential backoff, then dead-lettered
+MAX_DELIVERY_ATTEMPTS = 5
+RETRY_BASE_DELAY_SECONDS = 10
+RETRY_MAX_DELAY_SECONDS = 600
+DEAD_LETTER_STORAGE_KEY = f"{STORAGE_KEY}.dead_letters"
+DEAD_LETTER_STORAGE_VERSION = 1
+MAX_DEAD_LETTERS = 500
+
+# Every change bumps the persisted revision; recent changes are kept in
+# memory for get_changes
+MAX_CHANGE_LOG = 1000
+
+# Full user sync interval (safety net, users are synced from auth events)
+CONF_SYNC_INTERVAL = "sync_interval"
+DEFAULT_SYNC_INTERVAL_MINUTES = 60  # 0 disables periodic sync
+
+# Diagnostics: phase timings of the most recent coordinator refreshes
+REFRESH_TIMINGS_KEPT = 20
 
 # Defaults for new users
 DEFAULT_ONBOARD = False
@@ -20,13 +71,24 @@ DEFAULT_NOTIFIERS = []
 # Service names
 SERVICE_SET_USER = "set_user"
 SERVICE_SET_USER_NOTIFIERS = "set_user_notifiers"
+SERVICE_SET_USERS = "set_users"
+SERVICE_SET_USERS_NOTIFIERS = "set_users_notifiers"
 SERVICE_RELOAD_USERS = "reload_users"
 SERVICE_EXPORT_STATE = "export_state"
+SERVICE_FLUSH = "flush"
+SERVICE_LIST_DEAD_LETTERS = "list_dead_letters"
+SERVICE_REPLAY_DEAD_LETTERS = "replay_dead_letters"
+SERVICE_GET_DELIVERY_METRICS = "get_delivery_metrics"
+SERVICE_GET_CHANGES = "get_changes"
 
 # Notifier modes
 NOTIFIER_MODE_REPLACE = "replace"
 NOTIFIER_MODE_ADD = "add"
 NOTIFIER_MODE_REMOVE = "remove"
 
+# Events fired when users or roles change
+EVENT_USER_CHANGED = f"{DOMAIN}_user_changed"
+EVENT_ROLES_CHANGED = f"{DOMAIN}_roles_changed"
+
 # Entity prefixes
 ENTITY_PREFIX = "onboard_manager"
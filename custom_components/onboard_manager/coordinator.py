@@ -1,43 +1,105 @@
 """Coordinator for Onboard Manager."""
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
 from datetime import timedelta
 import logging
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, UPDATE_INTERVAL_SECONDS
+from .const import (
+    CONF_SYNC_INTERVAL,
+    DEFAULT_SYNC_INTERVAL_MINUTES,
+    DOMAIN,
+    EVENT_ROLES_CHANGED,
+    EVENT_USER_CHANGED,
+    REFRESH_TIMINGS_KEPT,
+)
+from .metrics import PhaseTimer
+from .models import RoleCatalog, UserRecord, diff_user_records
 from .storage import OnboardStorage
 from .user_registry import (
-    compute_active_notifiers,
-    compute_active_notifiers_by_role,
+    ActiveNotifierIndex,
+    UserAttributeIndex,
+    UserNameIndex,
+    create_user_record,
+    is_ha_user,
     sync_users,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
+# Listener contexts: entities subscribe with the key of the data they show,
+# and are only called back when that data changed
+CONTEXT_ALL = ("all",)
+
+
+def user_context(user_id: str) -> tuple[str, str]:
+    """Return the listener context of a user's entities."""
+    return ("user", user_id)
+
+
+def role_context(role_slug: str) -> tuple[str, str]:
+    """Return the listener context of a role's entities."""
+    return ("role", role_slug)
+
+
+def sync_interval_from_options(options: Mapping[str, Any]) -> timedelta | None:
+    """Return the periodic full sync interval, or None if disabled."""
+    minutes = options.get(CONF_SYNC_INTERVAL, DEFAULT_SYNC_INTERVAL_MINUTES)
+    return timedelta(minutes=minutes) if minutes else None
+
+
 class OnboardManagerCoordinator(DataUpdateCoordinator):
     """Coordinator to manage onboard manager state."""
 
     def __init__(
         self,
         hass: HomeAssistant,
+        config_entry: ConfigEntry,
         storage: OnboardStorage,
+        sync_interval: timedelta | None = None,
     ) -> None:
-        """Initialize coordinator."""
+        """Initialize coordinator.
+
+        Users are kept in sync from Home Assistant auth events, so the
+        periodic full sync is only a safety net and may be disabled.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=UPDATE_INTERVAL_SECONDS),
+            update_interval=sync_interval,
         )
+        # Set explicitly, so events name their entry outside of entry setup too
+        self.config_entry = config_entry
         self.storage = storage
+        self.notifier_index = ActiveNotifierIndex()
+        self.name_index = UserNameIndex()
+        self.attribute_index = UserAttributeIndex()
+        # False while the data holds aggregates restored from storage
+        self._notifier_index_synced = False
+        self._changed_contexts: set[Any] | None = None
+        # Listener callbacks by context, for updates of changed contexts only
+        self._context_listeners: dict[Any, list[CALLBACK_TYPE]] = {}
+        self._role_catalog = RoleCatalog.from_roles(storage.get_roles())
+        self._role_catalog_roles = list(storage.get_roles())
+        # Phase timings of recent refreshes, completed when listeners ran
+        self.refresh_timings: deque[dict[str, Any]] = deque(
+            maxlen=REFRESH_TIMINGS_KEPT
+        )
+        self._pending_timer: tuple[str, PhaseTimer] | None = None
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from storage and compute aggregates."""
+        timer = PhaseTimer()
         try:
             # Get current data from storage
             data = self.storage.get_data()
@@ -46,64 +108,368 @@ class OnboardManagerCoordinator(DataUpdateCoordinator):
 
             # Sync users with Home Assistant
             updated_users, removed_user_ids = await sync_users(
-                self.hass, users, roles
+                self.hass, users, self._role_catalog_for(roles)
             )
+            timer.mark("sync_users")
 
-            # Update storage with synced users
+            # Update storage with synced users (storage keeps its own dict so
+            # single-user changes can be told apart from the published data)
             if removed_user_ids or updated_users != users:
-                self.storage.update_data({"roles": roles, "users": updated_users})
-                await self.storage.async_save()
+                self.storage.update_data(
+                    {"roles": roles, "users": dict(updated_users)}
+                )
+                self.storage.async_schedule_save()
+            timer.mark("storage_save")
 
-            # Compute active notifiers
-            active_notifiers_all = compute_active_notifiers(updated_users)
-            active_notifiers_by_role = compute_active_notifiers_by_role(updated_users)
+            previous_users = self.data["users"] if self.data else {}
+            added_user_ids = {
+                user_id for user_id in updated_users if user_id not in previous_users
+            }
+            changed_user_ids = added_user_ids | removed_user_ids
+            changed_user_ids.update(
+                user_id
+                for user_id, user in updated_users.items()
+                if user_id in previous_users and previous_users[user_id] is not user
+            )
+
+            # Update active notifiers and user lookups
+            self.notifier_index.sync(updated_users)
+            self._notifier_index_synced = True
+            self.name_index.sync(updated_users)
+            self.attribute_index.sync(updated_users)
 
             # Return coordinated state
-            return {
+            new_data = {
                 "roles": roles,
+                "role_catalog": self._role_catalog_for(roles),
                 "users": updated_users,
-                "active_notifiers_all": active_notifiers_all,
-                "active_notifiers_by_role": active_notifiers_by_role,
+                "active_notifiers_all": self.notifier_index.active_notifiers_all,
+                "active_notifiers_by_role": self.notifier_index.active_notifiers_by_role,
+                "added_user_ids": added_user_ids,
                 "removed_user_ids": removed_user_ids,
             }
+            self._changed_contexts = self._changed_contexts_for(
+                new_data, changed_user_ids
+            )
+            self.storage.set_aggregates(
+                new_data["active_notifiers_all"], new_data["active_notifiers_by_role"]
+            )
+            if self.data is not None:
+                if roles != self.data["roles"]:
+                    self.hass.bus.async_fire(
+                        EVENT_ROLES_CHANGED,
+                        {
+                            "entry_id": self.config_entry.entry_id,
+                            "old": self.data["roles"],
+                            "new": roles,
+                        },
+                    )
+                self._async_fire_user_events(
+                    (previous_users.get(user_id), updated_users.get(user_id))
+                    for user_id in changed_user_ids
+                )
+            timer.mark("aggregates")
+            self._pending_timer = ("full_sync", timer)
+            return new_data
 
         except Exception as err:
+            # Listeners are still called after a failed refresh, all of them
+            self._changed_contexts = None
+            self._pending_timer = None
             raise UpdateFailed(f"Error updating onboard manager data: {err}") from err
 
+    @callback
+    def async_restore(self) -> bool:
+        """
+        Publish the stored data without syncing users with Home Assistant.
+
+        Lets entities be set up right away at startup; the sync with Home
+        Assistant users follows with the next refresh. Aggregates saved with
+        the data are used as they are, and the notifier index is only built
+        once a user changes. Returns True if cached aggregates were used.
+        """
+        timer = PhaseTimer()
+        roles = self.storage.get_roles()
+        users = dict(self.storage.get_users())
+        self.name_index.sync(users)
+        self.attribute_index.sync(users)
+
+        if (aggregates := self.storage.cached_aggregates) is not None:
+            active_all, active_by_role = aggregates
+        else:
+            self.notifier_index.sync(users)
+            self._notifier_index_synced = True
+            active_all = self.notifier_index.active_notifiers_all
+            active_by_role = self.notifier_index.active_notifiers_by_role
+            self.storage.set_aggregates(active_all, active_by_role)
+        timer.mark("aggregates")
+
+        self._pending_timer = ("restore", timer)
+        self.async_set_updated_data(
+            {
+                "roles": roles,
+                "role_catalog": self._role_catalog_for(roles),
+                "users": users,
+                "active_notifiers_all": active_all,
+                "active_notifiers_by_role": active_by_role,
+                "added_user_ids": set(users),
+                "removed_user_ids": set(),
+            }
+        )
+        return aggregates is not None
+
     async def async_reload_users(self) -> None:
         """Force reload of users."""
         await self.async_refresh()
 
+    async def async_handle_user_event(self, event: Event) -> None:
+        """Handle a Home Assistant user being added, updated or removed."""
+        await self.async_sync_user(event.data["user_id"])
+
+    async def async_sync_user(self, user_id: str) -> None:
+        """Sync a single Home Assistant user with storage."""
+        if self.data is None:
+            return
+
+        user = await self.hass.auth.async_get_user(user_id)
+        stored_user = self.storage.get_user(user_id)
+
+        if not is_ha_user(user):
+            if stored_user is None:
+                return
+            _LOGGER.info(f"Removing user {stored_user.name}")
+            self.storage.delete_user(user_id)
+            self.storage.async_schedule_save()
+            self._async_apply_user_change(user_id, None)
+            return
+
+        if stored_user is None:
+            new_user = create_user_record(
+                user, self._role_catalog_for(self.storage.get_roles()).default_slug
+            )
+        elif stored_user.name != (user.name or "Unknown"):
+            new_user = replace(stored_user, name=user.name or "Unknown")
+        else:
+            return
+
+        self.storage.set_user(user_id, new_user)
+        self.storage.async_schedule_save()
+        self._async_apply_user_change(user_id, new_user)
+
     async def async_update_user(
         self,
         user_id: str,
         updates: dict[str, Any],
     ) -> None:
-        """Update a user's settings and refresh."""
-        self.storage.update_user(user_id, updates)
-        await self.storage.async_save()
-        await self.async_refresh()
+        """Update a user's settings and push the change to listeners.
+
+        Only the changed user is patched into the coordinator data; the full
+        reconciliation against Home Assistant users is left to the update
+        interval and the reload_users service.
+        """
+        if not self.storage.update_user(user_id, updates):
+            return
+        self.storage.async_schedule_save()
+        self._async_apply_user_change(user_id, self.storage.get_user(user_id))
+
+    async def async_update_users(self, updates: dict[str, dict[str, Any]]) -> None:
+        """Update several users at once with a single save and update."""
+        updated_user_ids = [
+            user_id
+            for user_id, user_updates in updates.items()
+            if self.storage.update_user(user_id, user_updates)
+        ]
+        if not updated_user_ids:
+            return
+        self.storage.async_schedule_save()
+        self._async_apply_user_changes(
+            {user_id: self.storage.get_user(user_id) for user_id in updated_user_ids}
+        )
+
+    @callback
+    def _async_apply_user_change(
+        self,
+        user_id: str,
+        new_user: UserRecord | None,
+    ) -> None:
+        """Patch a single user change into the data and notify listeners."""
+        self._async_apply_user_changes({user_id: new_user})
+
+    @callback
+    def _async_apply_user_changes(
+        self,
+        changes: dict[str, UserRecord | None],
+    ) -> None:
+        """Patch user changes (None if removed) into the data and notify listeners."""
+        if self.data is None:
+            return
+
+        timer = PhaseTimer()
+        users = self.data["users"]
+        if not self._notifier_index_synced:
+            self.notifier_index.sync(users)
+            self._notifier_index_synced = True
+        added_user_ids = set()
+        removed_user_ids = set()
+        user_diffs: list[tuple[UserRecord | None, UserRecord | None]] = []
+        for user_id, new_user in changes.items():
+            user_diffs.append((users.get(user_id), new_user))
+            if new_user is None:
+                if users.pop(user_id, None) is not None:
+                    removed_user_ids.add(user_id)
+            else:
+                if user_id not in users:
+                    added_user_ids.add(user_id)
+                users[user_id] = new_user
+
+            self.notifier_index.update_user(user_id, new_user)
+            self.name_index.update_user(user_id, new_user and new_user.name)
+            self.attribute_index.update_user(user_id, new_user)
+
+        new_data = {
+            **self.data,
+            "users": users,
+            "active_notifiers_all": self.notifier_index.active_notifiers_all,
+            "active_notifiers_by_role": self.notifier_index.active_notifiers_by_role,
+            "added_user_ids": added_user_ids,
+            "removed_user_ids": removed_user_ids,
+        }
+        self._changed_contexts = self._changed_contexts_for(new_data, changes.keys())
+        self.storage.set_aggregates(
+            new_data["active_notifiers_all"], new_data["active_notifiers_by_role"]
+        )
+        self._async_fire_user_events(user_diffs)
+        timer.mark("aggregates")
+        self._pending_timer = ("user_change", timer)
+        self.async_set_updated_data(new_data)
+
+    @callback
+    def _async_fire_user_events(
+        self, user_diffs: Iterable[tuple[UserRecord | None, UserRecord | None]]
+    ) -> None:
+        """Fire a user changed event per (old, new) user pair that differs."""
+        for old_user, new_user in user_diffs:
+            if not (changes := diff_user_records(old_user, new_user)):
+                continue
+            user = new_user or old_user
+            self.hass.bus.async_fire(
+                EVENT_USER_CHANGED,
+                {
+                    "entry_id": self.config_entry.entry_id,
+                    "user_id": user.user_id,
+                    "name": user.name,
+                    "changes": changes,
+                },
+            )
+
+    def _changed_contexts_for(
+        self, new_data: dict[str, Any], changed_user_ids: Iterable[str]
+    ) -> set[Any] | None:
+        """
+        Return the listener contexts affected by moving to new data.
+
+        Aggregate lists are only replaced when their contents change, so
+        comparing them by identity is enough. Returns None when every entity
+        has to be updated.
+        """
+        old_data = self.data
+        if old_data is None or old_data["roles"] != new_data["roles"]:
+            return None
+
+        contexts: set[Any] = {user_context(user_id) for user_id in changed_user_ids}
+        if new_data["active_notifiers_all"] is not old_data["active_notifiers_all"]:
+            contexts.add(CONTEXT_ALL)
+        old_by_role = old_data["active_notifiers_by_role"]
+        new_by_role = new_data["active_notifiers_by_role"]
+        if new_by_role is not old_by_role:
+            for role_slug in old_by_role.keys() | new_by_role.keys():
+                if new_by_role.get(role_slug) is not old_by_role.get(role_slug):
+                    contexts.add(role_context(role_slug))
+        return contexts
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> CALLBACK_TYPE:
+        """Listen for data updates, keeping the listener by its context."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        listeners = self._context_listeners.setdefault(context, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_context_listener() -> None:
+            """Remove the listener."""
+            remove_listener()
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._context_listeners[context]
+
+        return remove_context_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update listeners whose data changed, or all if unknown."""
+        pending_timer = self._pending_timer
+        changed_contexts = self._changed_contexts
+        if pending_timer is not None:
+            # Time only the dispatch itself, not the wait for it
+            pending_timer[1].restart()
+        try:
+            if changed_contexts is None:
+                notified = sum(map(len, self._context_listeners.values()))
+                super().async_update_listeners()
+            else:
+                # Listeners without context (platform bookkeeping) always run
+                callbacks = list(self._context_listeners.get(None, ()))
+                for context in changed_contexts:
+                    callbacks.extend(self._context_listeners.get(context, ()))
+                for update_callback in callbacks:
+                    update_callback()
+                notified = len(callbacks)
+        finally:
+            # Never carry the contexts of this update over to the next one,
+            # even if a listener raised
+            self._changed_contexts = None
+            self._pending_timer = None
+
+        if pending_timer is not None:
+            kind, timer = pending_timer
+            timer.mark("listeners")
+            self.refresh_timings.append(
+                {
+                    "kind": kind,
+                    "finished": dt_util.utcnow().isoformat(),
+                    "listeners_notified": notified,
+                    **timer.as_dict(),
+                }
+            )
+
+    def _role_catalog_for(self, roles: list[dict[str, str]]) -> RoleCatalog:
+        """Return the role catalog of a role list, rebuilt only on change."""
+        if roles != self._role_catalog_roles:
+            self._role_catalog = RoleCatalog.from_roles(roles)
+            self._role_catalog_roles = list(roles)
+        return self._role_catalog
 
     async def async_update_roles(self, roles: list[dict[str, str]]) -> None:
         """Update roles and reassign users if needed."""
         data = self.storage.get_data()
         old_roles = data.get("roles", [])
-        users = data.get("users", {})
+        # Work on a copy, so storage can tell which users changed
+        users = dict(data.get("users", {}))
 
-        # Get valid role slugs
-        valid_slugs = {role["slug"] for role in roles}
-        default_slug = roles[0]["slug"] if roles else "default"
+        role_catalog = self._role_catalog_for(roles)
+        default_slug = role_catalog.default_slug
 
         # Reassign users with invalid roles
-        for user_id, user_data in users.items():
-            if user_data.get("role") not in valid_slugs:
+        for user_id, user in users.items():
+            if user.role not in role_catalog:
                 _LOGGER.info(
-                    f"Reassigning user {user_data.get('name', user_id)} from "
-                    f"{user_data.get('role')} to {default_slug}"
+                    f"Reassigning user {user.name} from {user.role} to {default_slug}"
                 )
-                user_data["role"] = default_slug
+                users[user_id] = replace(user, role=default_slug)
 
         # Update storage
         self.storage.update_data({"roles": roles, "users": users})
-        await self.storage.async_save()
+        self.storage.async_schedule_save()
         await self.async_refresh()
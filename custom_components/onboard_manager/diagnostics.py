@@ -0,0 +1,60 @@
+"""Diagnostics support for Onboard Manager."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    storage = entry_data["storage"]
+    dispatcher = entry_data["dispatcher"]
+
+    data = coordinator.data or {}
+    users = data.get("users", {})
+    notifiers = {notifier for user in users.values() for notifier in user.notifiers}
+
+    registry = er.async_get(hass)
+    entities_per_platform = Counter(
+        registry_entry.domain
+        for registry_entry in er.async_entries_for_config_entry(
+            registry, entry.entry_id
+        )
+    )
+
+    return {
+        "options": dict(entry.options),
+        "setup": entry_data.get("setup"),
+        "counts": {
+            "users": len(users),
+            "active_users": sum(1 for user in users.values() if user.is_active),
+            "roles": len(data.get("roles", [])),
+            "notifiers": len(notifiers),
+            "active_notifiers": len(data.get("active_notifiers_all", [])),
+            "entities_per_platform": dict(entities_per_platform),
+        },
+        "storage": {
+            "document_size_bytes": storage.document_size(),
+            "dirty": storage.dirty,
+            "last_serialize_ms": storage.last_serialize_ms,
+        },
+        "refresh_timings": list(coordinator.refresh_timings),
+        "dispatch": {
+            "queue_depth": dispatcher.queue_depth,
+            "retrying": dispatcher.retry_depth,
+            "dead_letters": len(entry_data["dead_letters"]),
+            "suppressed": dispatcher.suppressed,
+            "dropped": dispatcher.dropped,
+        },
+        "notify_services": list(entry_data.get("notify_services", [])),
+    }
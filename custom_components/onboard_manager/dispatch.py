@@ -0,0 +1,790 @@
+"""Notification dispatch engine for Onboard Manager."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Hashable, Iterable, Sequence
+import heapq
+import itertools
+import json
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.notify import ATTR_DATA, ATTR_MESSAGE, ATTR_TARGET, ATTR_TITLE
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceNotFound,
+    ServiceValidationError,
+)
+
+from .const import (
+    ATTR_PRIORITY,
+    CONF_DUPLICATE_WINDOW,
+    CONF_MAX_PARALLEL_SENDS,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
+    CONF_SEND_TIMEOUT,
+    DEFAULT_DUPLICATE_WINDOW_SECONDS,
+    DEFAULT_MAX_PARALLEL_SENDS,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT_PER_MINUTE,
+    DEFAULT_SEND_TIMEOUT_SECONDS,
+    MAX_DELIVERY_ATTEMPTS,
+    MAX_QUEUED_PER_NOTIFIER,
+    MAX_RECENT_MESSAGES,
+    PRIORITY_CRITICAL,
+    PRIORITY_INFO,
+    PRIORITY_NORMAL,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+)
+from .metrics import DeliveryMetrics
+from .storage import DeadLetterStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# A compiled notifier: (service domain, service name)
+Target = tuple[str, str]
+
+# A queued message: (priority rank, sequence, enqueued at, group, service data)
+QueuedMessage = tuple[int, int, float, str, dict[str, Any]]
+
+# A scheduled retry: (due, sequence, attempt, group, target, service data)
+Retry = tuple[float, int, int, str, Target, dict[str, Any]]
+
+GROUP_ALL = "all"
+
+# Queue order of the rate-limited priorities (lower is sent first)
+PRIORITY_RANKS = {PRIORITY_NORMAL: 0, PRIORITY_INFO: 1}
+RANK_PRIORITIES = {rank: priority for priority, rank in PRIORITY_RANKS.items()}
+
+# Outcome of a delivery attempt: sent, failed for now (retried) or rejected
+# by the notifier (dead-lettered without retrying)
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
+DELIVERY_REJECTED = "rejected"
+
+# Number of recent deliveries the latency statistics are computed from
+LATENCY_SAMPLES = 100
+
+
+def user_group(user_id: str) -> str:
+    """Return the dispatch group key for a user."""
+    return f"user_{user_id}"
+
+
+def role_group(role_slug: str) -> str:
+    """Return the dispatch group key for a role."""
+    return f"role_{role_slug}"
+
+
+def compile_targets(notifiers: Iterable[str]) -> tuple[Target, ...]:
+    """Parse notifier names into deduplicated (domain, service) targets."""
+    targets: list[Target] = []
+    for notifier in dict.fromkeys(notifiers):
+        # Parse notifier service name
+        if notifier.startswith("notify."):
+            targets.append(("notify", notifier[7:]))  # Remove "notify." prefix
+        else:
+            targets.append(("notify", notifier))
+    return tuple(targets)
+
+
+def build_service_data(
+    message: str, title: str | None, kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    """Build the service data passed to every notifier."""
+    service_data: dict[str, Any] = {ATTR_MESSAGE: message}
+    if title:
+        service_data[ATTR_TITLE] = title
+    if ATTR_DATA in kwargs:
+        data = kwargs[ATTR_DATA]
+        if isinstance(data, dict) and ATTR_PRIORITY in data:
+            # The priority is for the dispatcher, not the notifiers
+            data = {key: value for key, value in data.items() if key != ATTR_PRIORITY}
+        if data:
+            service_data[ATTR_DATA] = data
+    if ATTR_TARGET in kwargs:
+        service_data[ATTR_TARGET] = kwargs[ATTR_TARGET]
+    return service_data
+
+
+def message_priority(data: Any) -> str:
+    """Return the priority set in the data of a message; unknown values are normal."""
+    if isinstance(data, dict):
+        priority = data.get(ATTR_PRIORITY)
+        if priority == PRIORITY_CRITICAL or priority in PRIORITY_RANKS:
+            return priority
+    return PRIORITY_NORMAL
+
+
+def retry_delay(attempt: int) -> float:
+    """Return the backoff before retrying a delivery that failed attempt times."""
+    return min(RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1), RETRY_MAX_DELAY_SECONDS)
+
+
+def message_key(
+    service_data: dict[str, Any], priority: str
+) -> tuple[str, str | None, int, int, int]:
+    """
+    Return the key identifying a message for duplicate suppression.
+
+    The key holds the priority, the title and hashes of the text, target
+    and data. The priority is part of the key, so a message escalated to a
+    higher priority (for example from info to critical) is not a duplicate.
+    The target and data may hold unhashable values, so they are hashed
+    through their JSON form with sorted keys.
+    """
+    return (
+        priority,
+        service_data.get(ATTR_TITLE),
+        hash(service_data[ATTR_MESSAGE]),
+        _stable_hash(service_data.get(ATTR_TARGET)),
+        _stable_hash(service_data.get(ATTR_DATA)),
+    )
+
+
+def _stable_hash(value: Any) -> int:
+    """Return a hash of a JSON-like value that doesn't depend on key order."""
+    return hash(json.dumps(value, sort_keys=True, default=str))
+
+
+class RecentMessages:
+    """
+    Bounded cache of recently sent messages, expiring after a time window.
+
+    Entries are kept in insertion order, so expired entries are dropped from
+    the front and the oldest entry is evicted when the cache is full.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize an empty cache."""
+        self._max_entries = max_entries
+        self._expires: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached messages."""
+        return len(self._expires)
+
+    def seen(self, key: Hashable, now: float) -> bool:
+        """Return True if a key was remembered and has not expired."""
+        expires = self._expires
+        while expires:
+            oldest, expires_at = next(iter(expires.items()))
+            if expires_at > now:
+                break
+            del expires[oldest]
+        return expires.get(key, 0) > now
+
+    def add(self, key: Hashable, now: float, window: float) -> None:
+        """Remember a key for a time window."""
+        expires = self._expires
+        expires[key] = now + window
+        expires.move_to_end(key)
+        if len(expires) > self._max_entries:
+            expires.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Forget a key, for a message that was not delivered after all."""
+        self._expires.pop(key, None)
+
+
+class TokenBucket:
+    """Token bucket limiting the delivery rate of a single notifier."""
+
+    def __init__(self, rate_per_minute: float, burst: int, now: float) -> None:
+        """Initialize a full bucket."""
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self._rate = rate_per_minute / 60
+        self._tokens = float(burst)
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Return the seconds until a token is available."""
+        self._refill(now)
+        if self._tokens >= 1:
+            return 0
+        return (1 - self._tokens) / self._rate
+
+    def consume(self, now: float) -> None:
+        """Take a token."""
+        self._refill(now)
+        self._tokens -= 1
+
+
+class NotifyDispatcher:
+    """
+    Deliver notifications for all notify groups of a config entry.
+
+    Each group keeps its compiled targets together with the notifier list
+    they were compiled from. The coordinator only replaces a notifier list
+    when its membership changes, so an identity check is enough to know when
+    a group has to be recompiled.
+
+    Critical messages are delivered right away. Other messages go to a
+    priority queue per notifier, drained by one worker per busy notifier at
+    the rate its token bucket allows.
+
+    Failed deliveries are retried with exponential backoff. Pending retries
+    are kept in a single heap served by one timer, and deliveries that still
+    fail after the last attempt are moved to the dead letter store.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        dead_letters: DeadLetterStore,
+    ) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._config_entry = config_entry
+        self.dead_letters = dead_letters
+        self._groups: dict[str, tuple[Sequence[str], tuple[Target, ...]]] = {}
+        self._queues: dict[Target, list[QueuedMessage]] = {}
+        self._workers: dict[Target, asyncio.Task[None]] = {}
+        self._buckets: dict[Target, TokenBucket] = {}
+        self._sequence = itertools.count()
+        self._semaphore = asyncio.Semaphore(DEFAULT_MAX_PARALLEL_SENDS)
+        self._semaphore_limit = DEFAULT_MAX_PARALLEL_SENDS
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._recent = RecentMessages(MAX_RECENT_MESSAGES)
+        self.suppressed = 0
+        self.dropped = 0
+        self.metrics = DeliveryMetrics()
+        self._retries: list[Retry] = []
+        self._retry_timer: asyncio.TimerHandle | None = None
+        self._retry_due = 0.0
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._listeners_scheduled = False
+
+    @callback
+    def group_targets(
+        self, group: str, notifiers: Sequence[str]
+    ) -> tuple[Target, ...]:
+        """Return the compiled targets of a group, recompiling if changed."""
+        cached = self._groups.get(group)
+        if cached is not None and cached[0] is notifiers:
+            return cached[1]
+        targets = compile_targets(notifiers)
+        self._groups[group] = (notifiers, targets)
+        return targets
+
+    @callback
+    def discard_group(self, group: str) -> None:
+        """Forget the compiled targets of a group that no longer exists."""
+        self._groups.pop(group, None)
+        self.metrics.discard_group(group)
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of messages waiting to be delivered."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def retry_depth(self) -> int:
+        """Return the number of deliveries waiting to be retried."""
+        return len(self._retries)
+
+    @property
+    def latency(self) -> float | None:
+        """Return the mean latency of recent deliveries in seconds."""
+        if not self._latencies:
+            return None
+        return sum(self._latencies) / len(self._latencies)
+
+    @property
+    def max_latency(self) -> float | None:
+        """Return the highest latency of recent deliveries in seconds."""
+        return max(self._latencies, default=None)
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for queue changes, returning a function to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_schedule_listeners(self) -> None:
+        """Call listeners once per event loop iteration, however many changes."""
+        if self._listeners_scheduled or not self._listeners:
+            return
+        self._listeners_scheduled = True
+        self.hass.loop.call_soon(self._async_call_listeners)
+
+    @callback
+    def _async_call_listeners(self) -> None:
+        """Call all listeners."""
+        self._listeners_scheduled = False
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def async_send(
+        self,
+        group: str,
+        notifiers: Sequence[str],
+        message: str,
+        title: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Send a message to all notifiers of a group.
+
+        Critical messages, and all messages when no rate limit is set, are
+        delivered before returning; other messages are queued and delivered
+        in the background.
+        """
+        targets = self.group_targets(group, notifiers)
+        if not targets:
+            _LOGGER.debug(f"No notifiers for group {group}")
+            return
+
+        priority = message_priority(kwargs.get(ATTR_DATA))
+        service_data = build_service_data(message, title, kwargs)
+        now = self.hass.loop.time()
+        window = self._config_entry.options.get(
+            CONF_DUPLICATE_WINDOW, DEFAULT_DUPLICATE_WINDOW_SECONDS
+        )
+        key = message_key(service_data, priority) if window else None
+        if key is not None:
+            targets = self._async_drop_duplicates(group, targets, key, now)
+            if not targets:
+                return
+
+        # Messages only count as sent once they are delivered or queued
+        if priority == PRIORITY_CRITICAL or not self._rate_limit():
+            if key is not None:
+                for target in targets:
+                    self._recent.add((target, *key), now, window)
+            await self._async_fan_out(group, targets, service_data)
+            return
+
+        for target in targets:
+            queued = self._async_enqueue(
+                target,
+                (
+                    PRIORITY_RANKS[priority],
+                    next(self._sequence),
+                    now,
+                    group,
+                    service_data,
+                ),
+            )
+            if queued and key is not None:
+                self._recent.add((target, *key), now, window)
+        self._async_schedule_listeners()
+
+    @callback
+    def _async_drop_duplicates(
+        self,
+        group: str,
+        targets: tuple[Target, ...],
+        key: tuple[Any, ...],
+        now: float,
+    ) -> tuple[Target, ...]:
+        """
+        Drop targets that received the same message within the window.
+
+        Overlapping groups (for example all and a role) often send the same
+        message to a notifier; only the first one is delivered.
+        """
+        unique: list[Target] = []
+        for target in targets:
+            if self._recent.seen((target, *key), now):
+                self.metrics.record_suppressed(group, f"{target[0]}.{target[1]}")
+            else:
+                unique.append(target)
+        if suppressed := len(targets) - len(unique):
+            self.suppressed += suppressed
+            _LOGGER.debug(f"Suppressed {suppressed} duplicate notifications")
+            self._async_schedule_listeners()
+        return tuple(unique)
+
+    @callback
+    def _async_enqueue(self, target: Target, item: QueuedMessage) -> bool:
+        """
+        Queue a message for a notifier and make sure a worker drains it.
+
+        Returns False if the queue is full of messages that go first.
+        """
+        queue = self._queues.setdefault(target, [])
+        if len(queue) >= MAX_QUEUED_PER_NOTIFIER:
+            # Make room by dropping the lowest priority, newest message
+            worst = max(queue)
+            if worst < item:
+                _LOGGER.warning(
+                    f"Queue for {target[0]}.{target[1]} is full, dropping message"
+                )
+                self._record_dropped(target, item)
+                return False
+            queue.remove(worst)
+            heapq.heapify(queue)
+            _LOGGER.warning(
+                f"Queue for {target[0]}.{target[1]} is full, dropped a queued message"
+            )
+            self._record_dropped(target, worst)
+            # The dropped message may be sent again
+            self._recent.discard(
+                (target, *message_key(worst[4], RANK_PRIORITIES[worst[0]]))
+            )
+        heapq.heappush(queue, item)
+
+        if target not in self._workers:
+            worker = self._config_entry.async_create_background_task(
+                self.hass,
+                self._async_drain(target),
+                f"onboard_manager notify queue {target[0]}.{target[1]}",
+            )
+            if not worker.done():
+                self._workers[target] = worker
+        return True
+
+    @callback
+    def _record_dropped(self, target: Target, item: QueuedMessage) -> None:
+        """Count a message dropped from (or not let into) a full queue."""
+        self.dropped += 1
+        self.metrics.record_dropped(item[3], f"{target[0]}.{target[1]}")
+        self._async_schedule_listeners()
+
+    @callback
+    def _rate_limit(self) -> int:
+        """Return the configured messages per minute per notifier, 0 if unlimited."""
+        return self._config_entry.options.get(
+            CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT_PER_MINUTE
+        )
+
+    @callback
+    def _bucket(self, target: Target, now: float) -> TokenBucket | None:
+        """Return the token bucket of a notifier, or None if unlimited."""
+        rate = self._rate_limit()
+        if not rate:
+            self._buckets.pop(target, None)
+            return None
+        burst = self._config_entry.options.get(CONF_RATE_BURST, DEFAULT_RATE_BURST)
+        bucket = self._buckets.get(target)
+        if bucket is None or (bucket.rate_per_minute, bucket.burst) != (rate, burst):
+            bucket = self._buckets[target] = TokenBucket(rate, burst, now)
+        return bucket
+
+    @callback
+    def _send_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent deliveries."""
+        limit = self._config_entry.options.get(
+            CONF_MAX_PARALLEL_SENDS, DEFAULT_MAX_PARALLEL_SENDS
+        )
+        if limit != self._semaphore_limit:
+            self._semaphore = asyncio.Semaphore(limit)
+            self._semaphore_limit = limit
+        return self._semaphore
+
+    @callback
+    def _send_timeout(self) -> float:
+        """Return the per-notifier send timeout."""
+        return self._config_entry.options.get(
+            CONF_SEND_TIMEOUT, DEFAULT_SEND_TIMEOUT_SECONDS
+        )
+
+    async def _async_drain(self, target: Target) -> None:
+        """Deliver the queued messages of a notifier, honoring its rate limit."""
+        queue = self._queues[target]
+        try:
+            while queue:
+                now = self.hass.loop.time()
+                bucket = self._bucket(target, now)
+                if bucket is not None:
+                    if delay := bucket.delay(now):
+                        await asyncio.sleep(delay)
+                        continue
+                    bucket.consume(now)
+
+                _, _, enqueued_at, group, service_data = heapq.heappop(queue)
+                self._async_schedule_listeners()
+                async with self._send_semaphore():
+                    await self._async_attempt(
+                        group, target, service_data, self._send_timeout()
+                    )
+                self._record_latency(enqueued_at)
+        finally:
+            self._workers.pop(target, None)
+            if not queue:
+                self._queues.pop(target, None)
+
+    @callback
+    def _record_latency(self, sent_at: float) -> None:
+        """Record the time from sending to delivery of a message."""
+        self._latencies.append(self.hass.loop.time() - sent_at)
+        self._async_schedule_listeners()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """
+        Stop all workers and the retry timer.
+
+        Queued messages are dropped; pending retries are moved to the dead
+        letter store so they survive a restart.
+        """
+        if dropped := self.queue_depth:
+            _LOGGER.warning(f"Dropping {dropped} queued notifications on unload")
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
+
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+        for _, _, attempt, group, target, service_data in self._retries:
+            self.dead_letters.async_add(
+                f"{target[0]}.{target[1]}", group, service_data, attempt - 1
+            )
+        self._retries.clear()
+        self._listeners.clear()
+
+    async def _async_fan_out(
+        self,
+        group: str,
+        targets: tuple[Target, ...],
+        service_data: dict[str, Any],
+    ) -> None:
+        """
+        Deliver to several targets concurrently.
+
+        At most max_parallel_sends deliveries run at the same time, so a hung
+        notifier only delays its own delivery.
+        """
+        semaphore = self._send_semaphore()
+        timeout = self._send_timeout()
+        sent_at = self.hass.loop.time()
+
+        async def _async_send(target: Target) -> None:
+            async with semaphore:
+                await self._async_attempt(group, target, service_data, timeout)
+            self._record_latency(sent_at)
+
+        await asyncio.gather(*(_async_send(target) for target in targets))
+
+    async def _async_attempt(
+        self,
+        group: str,
+        target: Target,
+        service_data: dict[str, Any],
+        timeout: float,
+        attempt: int = 1,
+    ) -> bool:
+        """
+        Deliver a message, scheduling a retry if it fails.
+
+        Only transient failures are retried; a message the notifier rejects
+        would fail the same way again, so it is dead-lettered at once.
+        """
+        outcome = await self._async_deliver(group, target, service_data, timeout)
+        if outcome == DELIVERY_SENT:
+            return True
+        if outcome == DELIVERY_REJECTED:
+            self._async_dead_letter(group, target, service_data, attempt)
+        else:
+            self._async_retry_later(group, target, service_data, attempt)
+        return False
+
+    @callback
+    def _async_retry_later(
+        self,
+        group: str,
+        target: Target,
+        service_data: dict[str, Any],
+        attempt: int,
+    ) -> None:
+        """Schedule the next attempt of a failed delivery, or dead-letter it."""
+        notifier = f"{target[0]}.{target[1]}"
+        if attempt >= MAX_DELIVERY_ATTEMPTS:
+            _LOGGER.error(
+                f"Giving up on notification to {notifier} after {attempt} attempts"
+            )
+            self._async_dead_letter(group, target, service_data, attempt)
+            return
+
+        delay = retry_delay(attempt)
+        _LOGGER.debug(f"Retrying notification to {notifier} in {delay}s")
+        heapq.heappush(
+            self._retries,
+            (
+                self.hass.loop.time() + delay,
+                next(self._sequence),
+                attempt + 1,
+                group,
+                target,
+                service_data,
+            ),
+        )
+        self._async_arm_retry_timer()
+        self._async_schedule_listeners()
+
+    @callback
+    def _async_dead_letter(
+        self,
+        group: str,
+        target: Target,
+        service_data: dict[str, Any],
+        attempt: int,
+    ) -> None:
+        """Move a delivery that won't be retried to the dead letter store."""
+        self.dead_letters.async_add(
+            f"{target[0]}.{target[1]}", group, service_data, attempt
+        )
+        self._async_schedule_listeners()
+
+    @callback
+    def _async_arm_retry_timer(self) -> None:
+        """Make sure the retry timer fires when the earliest retry is due."""
+        if not self._retries:
+            return
+        due = self._retries[0][0]
+        if self._retry_timer is not None:
+            if self._retry_due <= due:
+                return
+            self._retry_timer.cancel()
+        self._retry_due = due
+        self._retry_timer = self.hass.loop.call_at(due, self._async_run_due_retries)
+
+    @callback
+    def _async_run_due_retries(self) -> None:
+        """Start delivering all retries that are due."""
+        self._retry_timer = None
+        now = self.hass.loop.time()
+        due: list[Retry] = []
+        while self._retries and self._retries[0][0] <= now:
+            due.append(heapq.heappop(self._retries))
+        self._async_arm_retry_timer()
+        if due:
+            self._config_entry.async_create_background_task(
+                self.hass, self._async_retry(due), "onboard_manager notify retries"
+            )
+            self._async_schedule_listeners()
+
+    async def _async_retry(self, retries: list[Retry]) -> None:
+        """Deliver a batch of due retries concurrently."""
+        semaphore = self._send_semaphore()
+        timeout = self._send_timeout()
+
+        async def _async_send(retry: Retry) -> None:
+            _, _, attempt, group, target, service_data = retry
+            async with semaphore:
+                await self._async_attempt(
+                    group, target, service_data, timeout, attempt
+                )
+
+        await asyncio.gather(*(_async_send(retry) for retry in retries))
+
+    async def async_replay_dead_letters(
+        self, letter_ids: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Deliver dead letters again (all if no IDs are given).
+
+        Replayed letters leave the store; a replay that fails is retried
+        like a new message and dead-lettered again if it keeps failing.
+        """
+        letters = self.dead_letters.async_pop(letter_ids)
+        semaphore = self._send_semaphore()
+        timeout = self._send_timeout()
+
+        async def _async_send(letter: dict[str, Any]) -> dict[str, Any]:
+            domain, _, service = letter["notifier"].partition(".")
+            async with semaphore:
+                delivered = await self._async_attempt(
+                    letter["group"], (domain, service), letter["service_data"], timeout
+                )
+            return {
+                "id": letter["id"],
+                "notifier": letter["notifier"],
+                "status": "delivered" if delivered else "failed",
+            }
+
+        results = await asyncio.gather(*(_async_send(letter) for letter in letters))
+        self._async_schedule_listeners()
+        return list(results)
+
+    async def _async_deliver(
+        self,
+        group: str,
+        target: Target,
+        service_data: dict[str, Any],
+        timeout: float,
+    ) -> str:
+        """
+        Deliver a message to a single target and record its metrics.
+
+        Every delivery attempt goes through here, so this is the hook point
+        for delivery metrics and policies. Failures are logged and reported
+        via the returned outcome, never raised.
+        """
+        domain, service = target
+        started = self.hass.loop.time()
+        outcome = await self._async_call_notifier(target, service_data, timeout)
+        self.metrics.record_delivery(
+            group,
+            f"{domain}.{service}",
+            outcome == DELIVERY_SENT,
+            (self.hass.loop.time() - started) * 1000,
+        )
+        self._async_schedule_listeners()
+        if outcome == DELIVERY_SENT:
+            _LOGGER.debug(f"Sent notification to {domain}.{service} for group {group}")
+        return outcome
+
+    async def _async_call_notifier(
+        self,
+        target: Target,
+        service_data: dict[str, Any],
+        timeout: float,
+    ) -> str:
+        """
+        Call a notify service, returning the outcome of the delivery.
+
+        Timeouts and Home Assistant errors may pass, so they count as failed;
+        a missing service, invalid service data or an unexpected error won't
+        go away by trying again, so they count as rejected.
+        """
+        domain, service = target
+        try:
+            async with asyncio.timeout(timeout):
+                await self.hass.services.async_call(
+                    domain,
+                    service,
+                    service_data,
+                    blocking=True,
+                )
+        except (ServiceNotFound, ServiceValidationError, vol.Invalid) as err:
+            _LOGGER.error(f"Notification rejected by {domain}.{service}: {err}")
+            return DELIVERY_REJECTED
+        except TimeoutError:
+            _LOGGER.error(
+                f"Timed out after {timeout}s sending notification to {domain}.{service}"
+            )
+            return DELIVERY_FAILED
+        except HomeAssistantError as err:
+            _LOGGER.error(f"Failed to send notification to {domain}.{service}: {err}")
+            return DELIVERY_FAILED
+        except Exception:
+            _LOGGER.exception(
+                f"Unexpected error sending notification to {domain}.{service}"
+            )
+            return DELIVERY_REJECTED
+        return DELIVERY_SENT
@@ -0,0 +1,65 @@
+"""Shared entity helpers for Onboard Manager."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_remove_entities(hass: HomeAssistant, entities: Iterable[Entity]) -> None:
+    """
+    Remove entities of deleted users or roles.
+
+    Registered entities are removed from the entity registry, which also
+    removes them from the state machine. Entities without a registry entry
+    are removed from the state machine directly.
+    """
+    registry = er.async_get(hass)
+    for entity in entities:
+        if entity.entity_id and registry.async_get(entity.entity_id):
+            registry.async_remove(entity.entity_id)
+        else:
+            hass.async_create_task(entity.async_remove(force_remove=True))
+        _LOGGER.debug(f"Removed entity {entity.entity_id}")
+
+
+@callback
+def async_remove_orphaned_entities(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    platform_domain: str,
+    entities: Iterable[Entity],
+    keep_prefixes: tuple[str, ...] = (),
+) -> None:
+    """
+    Remove registry entries left over from users and roles that are gone.
+
+    Entries of the config entry on a platform that don't belong to one of
+    the platform's current entities were left behind by users and roles
+    removed while the integration was not running, or by versions that
+    didn't remove them. keep_prefixes lists the unique ID prefixes (after
+    the entry ID) of entities that are created later on demand.
+    """
+    registry = er.async_get(hass)
+    unique_ids = {entity.unique_id for entity in entities}
+    keep = tuple(f"{config_entry.entry_id}_{prefix}" for prefix in keep_prefixes)
+    orphans = [
+        registry_entry.entity_id
+        for registry_entry in er.async_entries_for_config_entry(
+            registry, config_entry.entry_id
+        )
+        if registry_entry.domain == platform_domain
+        and registry_entry.unique_id not in unique_ids
+        and not registry_entry.unique_id.startswith(keep)
+    ]
+    for entity_id in orphans:
+        registry.async_remove(entity_id)
+    if orphans:
+        _LOGGER.info(f"Removed {len(orphans)} orphaned {platform_domain} entities")
@@ -0,0 +1,186 @@
+"""Delivery metrics for Onboard Manager."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import time
+from typing import Any
+
+# Upper bounds of the latency histogram buckets in milliseconds; the last
+# bucket counts everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-size histogram of delivery latencies."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        """Record a latency."""
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total += latency_ms
+        if latency_ms > self.max:
+            self.max = latency_ms
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which a fraction of latencies fall."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for a service response."""
+        mean = self.mean
+        return {
+            "count": self.count,
+            "mean_ms": None if mean is None else round(mean, 1),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max, 1),
+            "buckets": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class DeliveryStats:
+    """Delivery counters and latency histogram of a notifier or group."""
+
+    __slots__ = ("sent", "failed", "suppressed", "dropped", "latency")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.sent = 0
+        self.failed = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for a service response."""
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "suppressed": self.suppressed,
+            "dropped": self.dropped,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class DeliveryMetrics:
+    """
+    Delivery statistics per notifier and per notify group.
+
+    Each notifier and group has a fixed-size record, so memory only grows
+    with the number of notifiers and groups, not with the number of
+    messages.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.notifiers: dict[str, DeliveryStats] = {}
+        self.groups: dict[str, DeliveryStats] = {}
+        self.new_notifiers: set[str] = set()
+
+    def _stats(self, group: str, notifier: str) -> tuple[DeliveryStats, DeliveryStats]:
+        """Return the statistics of a notifier and a group, creating them."""
+        notifier_stats = self.notifiers.get(notifier)
+        if notifier_stats is None:
+            notifier_stats = self.notifiers[notifier] = DeliveryStats()
+            self.new_notifiers.add(notifier)
+        group_stats = self.groups.get(group)
+        if group_stats is None:
+            group_stats = self.groups[group] = DeliveryStats()
+        return notifier_stats, group_stats
+
+    def record_delivery(
+        self, group: str, notifier: str, delivered: bool, latency_ms: float
+    ) -> None:
+        """Record a delivery attempt."""
+        for stats in self._stats(group, notifier):
+            if delivered:
+                stats.sent += 1
+            else:
+                stats.failed += 1
+            stats.latency.add(latency_ms)
+
+    def record_suppressed(self, group: str, notifier: str) -> None:
+        """Record a suppressed duplicate."""
+        for stats in self._stats(group, notifier):
+            stats.suppressed += 1
+
+    def record_dropped(self, group: str, notifier: str) -> None:
+        """Record a message dropped because the notifier's queue was full."""
+        for stats in self._stats(group, notifier):
+            stats.dropped += 1
+
+    def discard_group(self, group: str) -> None:
+        """Forget the statistics of a group that no longer exists."""
+        self.groups.pop(group, None)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for a service response."""
+        return {
+            "notifiers": {
+                notifier: stats.as_dict() for notifier, stats in self.notifiers.items()
+            },
+            "groups": {group: stats.as_dict() for group, stats in self.groups.items()},
+        }
+
+
+class PhaseTimer:
+    """
+    Split a run into named phases timed with the monotonic clock.
+
+    Each mark costs a single perf_counter call, so timers are always on.
+    """
+
+    __slots__ = ("phases", "_last")
+
+    def __init__(self) -> None:
+        """Start timing the first phase."""
+        self.phases: dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """End the current phase and attribute its time to a name."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def restart(self) -> None:
+        """Start the next phase now, leaving out the time since the last mark."""
+        self._last = time.perf_counter()
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the phase durations and their total in milliseconds."""
+        return {
+            **{
+                f"{phase}_ms": round(duration * 1000, 3)
+                for phase, duration in self.phases.items()
+            },
+            "total_ms": round(sum(self.phases.values()) * 1000, 3),
+        }
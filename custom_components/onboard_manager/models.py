@@ -0,0 +1,175 @@
+"""Data models for Onboard Manager."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+import sys
+from types import MappingProxyType
+from typing import Any
+
+from .const import DEFAULT_NOTIFY, DEFAULT_ONBOARD
+
+# Bits of the flags column of a stored user row
+FLAG_ONBOARD = 1
+FLAG_NOTIFY = 2
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    """
+    Settings of a managed user.
+
+    Records are immutable, so they can be shared between storage, the
+    coordinator data and entities without copying; changes create a new
+    record with dataclasses.replace. Role slugs are interned since every
+    user carries one of a handful of roles.
+    """
+
+    user_id: str
+    name: str = "Unknown"
+    onboard: bool = DEFAULT_ONBOARD
+    notify: bool = DEFAULT_NOTIFY
+    role: str = ""
+    notifiers: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        """Normalize field types."""
+        object.__setattr__(self, "role", sys.intern(self.role))
+        if not isinstance(self.notifiers, tuple):
+            object.__setattr__(self, "notifiers", tuple(self.notifiers))
+
+    @property
+    def is_active(self) -> bool:
+        """Return True if the user is onboard and has notifications enabled."""
+        return self.onboard and self.notify
+
+    @classmethod
+    def from_dict(cls, user_id: str, data: Mapping[str, Any]) -> UserRecord:
+        """Create a record from its exported (version 1 stored) form."""
+        return cls(
+            user_id=user_id,
+            name=data.get("name", "Unknown"),
+            onboard=bool(data.get("onboard", DEFAULT_ONBOARD)),
+            notify=bool(data.get("notify", DEFAULT_NOTIFY)),
+            role=data.get("role", ""),
+            notifiers=tuple(data.get("notifiers", ())),
+        )
+
+    @classmethod
+    def from_row(
+        cls, user_id: str, row: list[Any], notifiers: list[str]
+    ) -> UserRecord:
+        """Create a record from a compact row, resolving notifier indexes."""
+        name, flags, role, notifier_ids = row
+        return cls(
+            user_id=user_id,
+            name=name,
+            onboard=bool(flags & FLAG_ONBOARD),
+            notify=bool(flags & FLAG_NOTIFY),
+            role=role,
+            notifiers=tuple(notifiers[index] for index in notifier_ids),
+        )
+
+    def as_row(self, notifier_ids: dict[str, int]) -> list[Any]:
+        """
+        Return the compact stored form of the record.
+
+        Rows are [name, flags, role, notifier indexes]; notifiers missing
+        from notifier_ids are added to it.
+        """
+        return [
+            self.name,
+            (FLAG_ONBOARD if self.onboard else 0) | (FLAG_NOTIFY if self.notify else 0),
+            self.role,
+            [
+                notifier_ids.setdefault(notifier, len(notifier_ids))
+                for notifier in self.notifiers
+            ],
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the exported (JSON) form of the record."""
+        return {
+            "user_id": self.user_id,
+            "name": self.name,
+            "onboard": self.onboard,
+            "notify": self.notify,
+            "role": self.role,
+            "notifiers": list(self.notifiers),
+        }
+
+
+# Fields reported in user change events
+EVENT_FIELDS = ("onboard", "notify", "role", "notifiers")
+
+
+def diff_user_records(
+    old: UserRecord | None, new: UserRecord | None
+) -> dict[str, dict[str, Any]]:
+    """
+    Return the event fields that differ between two versions of a user.
+
+    Fields map to {"old": ..., "new": ...}; values are None on the side
+    where the user does not exist.
+    """
+    changes: dict[str, dict[str, Any]] = {}
+    for field in EVENT_FIELDS:
+        old_value = None if old is None else getattr(old, field)
+        new_value = None if new is None else getattr(new, field)
+        if old_value != new_value:
+            if field == "notifiers":
+                old_value = None if old_value is None else list(old_value)
+                new_value = None if new_value is None else list(new_value)
+            changes[field] = {"old": old_value, "new": new_value}
+    return changes
+
+
+@dataclass(frozen=True, slots=True)
+class RoleCatalog:
+    """
+    Lookup tables of the configured roles.
+
+    Built once per role change and shared by services and entities, so role
+    lookups don't have to scan the role list.
+    """
+
+    slugs: tuple[str, ...]
+    labels: Mapping[str, str]
+    slugs_by_label: Mapping[str, str]
+    options: tuple[str, ...]
+
+    @classmethod
+    def from_roles(cls, roles: Iterable[Mapping[str, str]]) -> RoleCatalog:
+        """Build the catalog of a role list."""
+        labels: dict[str, str] = {}
+        slugs_by_label: dict[str, str] = {}
+        for role in roles:
+            slug = sys.intern(role["slug"])
+            labels.setdefault(slug, role["label"])
+            slugs_by_label.setdefault(role["label"].casefold(), slug)
+        return cls(
+            slugs=tuple(labels),
+            labels=MappingProxyType(labels),
+            slugs_by_label=MappingProxyType(slugs_by_label),
+            options=tuple(labels.values()),
+        )
+
+    def __contains__(self, role_slug: object) -> bool:
+        """Return True if a role slug exists."""
+        return role_slug in self.labels
+
+    @property
+    def default_slug(self) -> str:
+        """Return the role assigned to new users (first role)."""
+        return self.slugs[0] if self.slugs else "default"
+
+    def label(self, role_slug: str) -> str:
+        """Return the label of a role, or the slug if unknown."""
+        return self.labels.get(role_slug, role_slug)
+
+    def resolve(self, role_input: str) -> str | None:
+        """Resolve a role slug or label (case-insensitive) to its slug."""
+        # Try to match by slug first
+        if (slug := role_input.lower()) in self.labels:
+            return slug
+        return self.slugs_by_label.get(role_input.casefold())
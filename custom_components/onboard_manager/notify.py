@@ -10,7 +10,6 @@ from homeassistant.components.notify import (
     ATTR_TARGET,
     ATTR_TITLE,
     NotifyEntity,
-    BaseNotificationService,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall, callback
@@ -18,7 +17,14 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, ENTITY_PREFIX
-from .coordinator import OnboardManagerCoordinator
+from .coordinator import (
+    CONTEXT_ALL,
+    OnboardManagerCoordinator,
+    role_context,
+    user_context,
+)
+from .dispatch import GROUP_ALL, NotifyDispatcher, role_group, user_group
+from .entity import async_remove_entities, async_remove_orphaned_entities
 from .user_registry import get_short_id
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,19 +40,34 @@ async def async_setup_entry(
         "coordinator"
     ]
 
-    entities: list[NotifyEntity] = []
+    dispatcher: NotifyDispatcher = hass.data[DOMAIN][config_entry.entry_id][
+        "dispatcher"
+    ]
+
+    # Entities keyed by user_id / role slug, touched only on additions/removals
+    user_entities: dict[str, UserNotifyEntity] = {}
+    role_entities: dict[str, RoleNotifyEntity] = {}
 
     # Create per-user notify groups
     for user_id in coordinator.data["users"]:
-        entities.append(UserNotifyEntity(coordinator, config_entry, user_id))
-
-    # Create "all active" notify group
-    entities.append(AllActiveNotifyEntity(coordinator, config_entry))
+        user_entities[user_id] = UserNotifyEntity(
+            coordinator, config_entry, dispatcher, user_id
+        )
 
     # Create per-role notify groups
-    for role in coordinator.data["roles"]:
-        entities.append(RoleNotifyEntity(coordinator, config_entry, role["slug"]))
+    for role_slug in coordinator.data["role_catalog"].slugs:
+        role_entities[role_slug] = RoleNotifyEntity(
+            coordinator, config_entry, dispatcher, role_slug
+        )
+
+    # Create "all active" notify group
+    entities: list[NotifyEntity] = [
+        *user_entities.values(),
+        AllActiveNotifyEntity(coordinator, config_entry, dispatcher),
+        *role_entities.values(),
+    ]
 
+    async_remove_orphaned_entities(hass, config_entry, "notify", entities)
     async_add_entities(entities)
 
     # Register legacy notify services for backward compatibility with Alert2 and other integrations
@@ -56,45 +77,45 @@ async def async_setup_entry(
     @callback
     def async_add_remove_entities() -> None:
         """Add or remove entities based on coordinator data."""
-        current_users = coordinator.data.get("users", {})
-        current_roles = coordinator.data.get("roles", [])
-
-        # Get existing entity user IDs
-        existing_user_ids = {
-            entity.user_id
-            for entity in entities
-            if isinstance(entity, UserNotifyEntity)
-        }
-
-        # Get existing role slugs
-        existing_role_slugs = {
-            entity.role_slug
-            for entity in entities
-            if isinstance(entity, RoleNotifyEntity)
-        }
-
-        new_entities = []
+        data = coordinator.data
+        new_entities: list[NotifyEntity] = []
+        removed_entities: list[NotifyEntity] = []
 
         # Add notify entities for new users
-        for user_id in current_users:
-            if user_id not in existing_user_ids:
-                new_entity = UserNotifyEntity(coordinator, config_entry, user_id)
-                new_entities.append(new_entity)
-
-        # Add notify entities for new roles
-        current_role_slugs = {role["slug"] for role in current_roles}
-        for role_slug in current_role_slugs:
-            if role_slug not in existing_role_slugs:
-                new_entity = RoleNotifyEntity(coordinator, config_entry, role_slug)
-                new_entities.append(new_entity)
+        for user_id in data.get("added_user_ids", ()):
+            if user_id not in user_entities:
+                user_entities[user_id] = UserNotifyEntity(
+                    coordinator, config_entry, dispatcher, user_id
+                )
+                new_entities.append(user_entities[user_id])
+
+        # Remove notify entities of deleted users
+        for user_id in data.get("removed_user_ids", ()):
+            if user_id in user_entities:
+                removed_entities.append(user_entities.pop(user_id))
+                dispatcher.discard_group(user_group(user_id))
+
+        # Add notify entities for new roles, remove those of deleted roles
+        role_catalog = data["role_catalog"]
+        for role_slug in role_catalog.slugs:
+            if role_slug not in role_entities:
+                role_entities[role_slug] = RoleNotifyEntity(
+                    coordinator, config_entry, dispatcher, role_slug
+                )
+                new_entities.append(role_entities[role_slug])
+        for role_slug in [r for r in role_entities if r not in role_catalog]:
+            removed_entities.append(role_entities.pop(role_slug))
+            dispatcher.discard_group(role_group(role_slug))
 
         if new_entities:
             async_add_entities(new_entities)
-            entities.extend(new_entities)
             # Register legacy services for new entities
             hass.async_create_task(
                 async_setup_legacy_notify_services(hass, coordinator, config_entry, new_entities)
             )
+        if removed_entities:
+            async_remove_legacy_notify_services(hass, config_entry, removed_entities)
+            async_remove_entities(hass, removed_entities)
 
     # Listen for coordinator updates
     config_entry.async_on_unload(
@@ -148,6 +169,27 @@ async def async_setup_legacy_notify_services(
             _LOGGER.debug(f"Legacy notify service already exists: notify.{service_name}")
 
 
+@callback
+def async_remove_legacy_notify_services(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    entities: list[NotifyEntity],
+) -> None:
+    """Unregister legacy notify services of removed entities."""
+    registered_services = hass.data[DOMAIN][config_entry.entry_id].get("notify_services", [])
+
+    for entity in entities:
+        if not entity.entity_id:
+            continue
+        service_name = entity.entity_id.replace("notify.", "")
+        if service_name not in registered_services:
+            continue
+        registered_services.remove(service_name)
+        if hass.services.has_service("notify", service_name):
+            hass.services.async_remove("notify", service_name)
+            _LOGGER.debug(f"Unregistered legacy notify service: notify.{service_name}")
+
+
 class UserNotifyEntity(CoordinatorEntity, NotifyEntity):
     """Notify entity for a specific user."""
 
@@ -155,10 +197,12 @@ class UserNotifyEntity(CoordinatorEntity, NotifyEntity):
         self,
         coordinator: OnboardManagerCoordinator,
         config_entry: ConfigEntry,
+        dispatcher: NotifyDispatcher,
         user_id: str,
     ) -> None:
         """Initialize the notify entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=user_context(user_id))
+        self._dispatcher = dispatcher
         self.user_id = user_id
         self._attr_has_entity_name = False
 
@@ -178,70 +222,42 @@ class UserNotifyEntity(CoordinatorEntity, NotifyEntity):
 
     def _update_attrs(self) -> None:
         """Update entity attributes."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             # User no longer exists
             self._attr_available = False
             return
 
-        name = user_data.get("name", "Unknown")
+        name = user.name
 
         # Respect the notify flag for availability
         # User groups ignore onboard flag (per spec)
-        self._attr_available = user_data.get("notify", True)
+        self._attr_available = user.notify
         self._attr_name = f"Onboard Manager: {name}"
 
     async def async_send_message(self, message: str, title: str | None = None, **kwargs: Any) -> None:
         """Send a message to all user's notifiers."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             _LOGGER.warning(f"User {self.user_id} not found")
             return
 
         # Check if notify is enabled
-        if not user_data.get("notify", True):
-            _LOGGER.debug(f"Notifications disabled for user {user_data.get('name', self.user_id)}")
+        if not user.notify:
+            _LOGGER.debug(f"Notifications disabled for user {user.name}")
             return
 
-        notifiers = user_data.get("notifiers", [])
+        notifiers = user.notifiers
         if not notifiers:
-            _LOGGER.debug(f"No notifiers configured for user {user_data.get('name', self.user_id)}")
+            _LOGGER.debug(f"No notifiers configured for user {user.name}")
             return
 
-        # Build service data
-        service_data = {ATTR_MESSAGE: message}
-        if title:
-            service_data[ATTR_TITLE] = title
-        if ATTR_DATA in kwargs:
-            service_data[ATTR_DATA] = kwargs[ATTR_DATA]
-        if ATTR_TARGET in kwargs:
-            service_data[ATTR_TARGET] = kwargs[ATTR_TARGET]
-
-        # Send to all notifiers (deduplicated)
-        seen = set()
-        for notifier in notifiers:
-            if notifier in seen:
-                continue
-            seen.add(notifier)
-
-            # Parse notifier service name
-            if notifier.startswith("notify."):
-                service_name = notifier[7:]  # Remove "notify." prefix
-            else:
-                service_name = notifier
-
-            try:
-                await self.hass.services.async_call(
-                    "notify",
-                    service_name,
-                    service_data,
-                    blocking=False,
-                )
-                _LOGGER.debug(f"Sent notification to {notifier}")
-            except Exception as err:
-                _LOGGER.error(f"Failed to send notification to {notifier}: {err}")
+        # Send to all notifiers (deduplicated by the dispatcher)
+        await self._dispatcher.async_send(
+            user_group(self.user_id), notifiers, message, title, **kwargs
+        )
 
 
 class AllActiveNotifyEntity(CoordinatorEntity, NotifyEntity):
@@ -251,9 +267,11 @@ class AllActiveNotifyEntity(CoordinatorEntity, NotifyEntity):
         self,
         coordinator: OnboardManagerCoordinator,
         config_entry: ConfigEntry,
+        dispatcher: NotifyDispatcher,
     ) -> None:
         """Initialize the notify entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=CONTEXT_ALL)
+        self._dispatcher = dispatcher
         self._attr_has_entity_name = False
         self._attr_unique_id = f"{config_entry.entry_id}_notify_all"
         self._attr_name = "Onboard Manager: All Active"
@@ -267,33 +285,8 @@ class AllActiveNotifyEntity(CoordinatorEntity, NotifyEntity):
             _LOGGER.debug("No active notifiers for all group")
             return
 
-        # Build service data
-        service_data = {ATTR_MESSAGE: message}
-        if title:
-            service_data[ATTR_TITLE] = title
-        if ATTR_DATA in kwargs:
-            service_data[ATTR_DATA] = kwargs[ATTR_DATA]
-        if ATTR_TARGET in kwargs:
-            service_data[ATTR_TARGET] = kwargs[ATTR_TARGET]
-
         # Send to all notifiers (already deduplicated in coordinator)
-        for notifier in notifiers:
-            # Parse notifier service name
-            if notifier.startswith("notify."):
-                service_name = notifier[7:]  # Remove "notify." prefix
-            else:
-                service_name = notifier
-
-            try:
-                await self.hass.services.async_call(
-                    "notify",
-                    service_name,
-                    service_data,
-                    blocking=False,
-                )
-                _LOGGER.debug(f"Sent notification to {notifier}")
-            except Exception as err:
-                _LOGGER.error(f"Failed to send notification to {notifier}: {err}")
+        await self._dispatcher.async_send(GROUP_ALL, notifiers, message, title, **kwargs)
 
 
 class RoleNotifyEntity(CoordinatorEntity, NotifyEntity):
@@ -303,21 +296,17 @@ class RoleNotifyEntity(CoordinatorEntity, NotifyEntity):
         self,
         coordinator: OnboardManagerCoordinator,
         config_entry: ConfigEntry,
+        dispatcher: NotifyDispatcher,
         role_slug: str,
     ) -> None:
         """Initialize the notify entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=role_context(role_slug))
+        self._dispatcher = dispatcher
         self.role_slug = role_slug
         self._attr_has_entity_name = False
         self._attr_unique_id = f"{config_entry.entry_id}_notify_role_{role_slug}"
 
-        # Get role label
-        role_label = role_slug
-        for role in coordinator.data.get("roles", []):
-            if role["slug"] == role_slug:
-                role_label = role["label"]
-                break
-
+        role_label = coordinator.data["role_catalog"].label(role_slug)
         self._attr_name = f"Onboard Manager: Role {role_label}"
         self.entity_id = f"notify.{ENTITY_PREFIX}_role_{role_slug}"
 
@@ -325,13 +314,7 @@ class RoleNotifyEntity(CoordinatorEntity, NotifyEntity):
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         # Check if role still exists
-        current_role_slugs = {
-            role["slug"] for role in self.coordinator.data.get("roles", [])
-        }
-        if self.role_slug not in current_role_slugs:
-            self._attr_available = False
-        else:
-            self._attr_available = True
+        self._attr_available = self.role_slug in self.coordinator.data["role_catalog"]
 
         super()._handle_coordinator_update()
 
@@ -344,30 +327,7 @@ class RoleNotifyEntity(CoordinatorEntity, NotifyEntity):
             _LOGGER.debug(f"No active notifiers for role {self.role_slug}")
             return
 
-        # Build service data
-        service_data = {ATTR_MESSAGE: message}
-        if title:
-            service_data[ATTR_TITLE] = title
-        if ATTR_DATA in kwargs:
-            service_data[ATTR_DATA] = kwargs[ATTR_DATA]
-        if ATTR_TARGET in kwargs:
-            service_data[ATTR_TARGET] = kwargs[ATTR_TARGET]
-
         # Send to all notifiers (already deduplicated in coordinator)
-        for notifier in notifiers:
-            # Parse notifier service name
-            if notifier.startswith("notify."):
-                service_name = notifier[7:]  # Remove "notify." prefix
-            else:
-                service_name = notifier
-
-            try:
-                await self.hass.services.async_call(
-                    "notify",
-                    service_name,
-                    service_data,
-                    blocking=False,
-                )
-                _LOGGER.debug(f"Sent notification to {notifier}")
-            except Exception as err:
-                _LOGGER.error(f"Failed to send notification to {notifier}: {err}")
+        await self._dispatcher.async_send(
+            role_group(self.role_slug), notifiers, message, title, **kwargs
+        )
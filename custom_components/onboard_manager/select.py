@@ -11,7 +11,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, ENTITY_PREFIX
-from .coordinator import OnboardManagerCoordinator
+from .coordinator import OnboardManagerCoordinator, user_context
+from .entity import async_remove_entities, async_remove_orphaned_entities
 from .user_registry import get_short_id
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,37 +28,40 @@ async def async_setup_entry(
         "coordinator"
     ]
 
-    entities: list[SelectEntity] = []
+    # Entities keyed by user_id, touched only on additions/removals
+    selects: dict[str, RoleSelect] = {}
 
     # Create per-user role selects
-    for user_id, user_data in coordinator.data["users"].items():
-        entities.append(RoleSelect(coordinator, config_entry, user_id))
+    for user_id in coordinator.data["users"]:
+        selects[user_id] = RoleSelect(coordinator, config_entry, user_id)
 
-    async_add_entities(entities)
+    async_remove_orphaned_entities(hass, config_entry, "select", selects.values())
+    async_add_entities(list(selects.values()))
 
     # Register platform update callback to handle user additions/removals
     @callback
     def async_add_remove_entities() -> None:
         """Add or remove entities based on coordinator data."""
-        current_users = coordinator.data.get("users", {})
-
-        # Get existing entity user IDs
-        existing_user_ids = {
-            entity.user_id
-            for entity in entities
-            if isinstance(entity, RoleSelect)
-        }
-
-        new_entities = []
+        data = coordinator.data
+        new_entities: list[SelectEntity] = []
 
         # Add selects for new users
-        for user_id in current_users:
-            if user_id not in existing_user_ids:
-                new_entities.append(RoleSelect(coordinator, config_entry, user_id))
+        for user_id in data.get("added_user_ids", ()):
+            if user_id not in selects:
+                selects[user_id] = RoleSelect(coordinator, config_entry, user_id)
+                new_entities.append(selects[user_id])
+
+        # Remove selects of deleted users
+        removed_entities = [
+            selects.pop(user_id)
+            for user_id in data.get("removed_user_ids", ())
+            if user_id in selects
+        ]
 
         if new_entities:
             async_add_entities(new_entities)
-            entities.extend(new_entities)
+        if removed_entities:
+            async_remove_entities(hass, removed_entities)
 
     # Listen for coordinator updates
     config_entry.async_on_unload(
@@ -75,7 +79,7 @@ class RoleSelect(CoordinatorEntity, SelectEntity):
         user_id: str,
     ) -> None:
         """Initialize the select."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=user_context(user_id))
         self.user_id = user_id
         self._attr_has_entity_name = False
 
@@ -95,41 +99,29 @@ class RoleSelect(CoordinatorEntity, SelectEntity):
 
     def _update_attrs(self) -> None:
         """Update select attributes."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             # User no longer exists
             self._attr_available = False
             return
 
         self._attr_available = True
-        name = user_data.get("name", "Unknown")
+        name = user.name
 
         self._attr_name = f"{name} Role"
 
-        # Get role options from coordinator
-        roles = self.coordinator.data.get("roles", [])
-        self._attr_options = [role["label"] for role in roles]
-
-        # Get current role and convert slug to label
-        current_role_slug = user_data.get("role", "")
-        current_role_label = current_role_slug
-        for role in roles:
-            if role["slug"] == current_role_slug:
-                current_role_label = role["label"]
-                break
-
-        self._attr_current_option = current_role_label
+        # Role options and labels are shared by all selects
+        role_catalog = self.coordinator.data["role_catalog"]
+        self._attr_options = role_catalog.options
+        self._attr_current_option = role_catalog.label(user.role)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
         # Convert label to slug
-        roles = self.coordinator.data.get("roles", [])
-        role_slug = None
-        for role in roles:
-            if role["label"] == option:
-                role_slug = role["slug"]
-                break
+        role_slug = self.coordinator.data["role_catalog"].slugs_by_label.get(
+            option.casefold()
+        )
 
         if role_slug:
             await self.coordinator.async_update_user(self.user_id, {"role": role_slug})
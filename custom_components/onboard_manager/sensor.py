@@ -1,22 +1,36 @@
 """Sensor platform for Onboard Manager."""
 from __future__ import annotations
 
+from abc import abstractmethod
+from collections.abc import Iterable
 import json
 import logging
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
 
 from .const import DOMAIN, ENTITY_PREFIX
-from .coordinator import OnboardManagerCoordinator
+from .coordinator import (
+    CONTEXT_ALL,
+    OnboardManagerCoordinator,
+    role_context,
+    user_context,
+)
+from .dispatch import NotifyDispatcher
+from .entity import async_remove_entities, async_remove_orphaned_entities
 from .user_registry import get_short_id
 
 _LOGGER = logging.getLogger(__name__)
 
+# Shared default, so a missing list keeps the same identity between updates
+NO_NOTIFIERS: list[str] = []
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -27,74 +41,149 @@ async def async_setup_entry(
     coordinator: OnboardManagerCoordinator = hass.data[DOMAIN][config_entry.entry_id][
         "coordinator"
     ]
+    dispatcher: NotifyDispatcher = hass.data[DOMAIN][config_entry.entry_id][
+        "dispatcher"
+    ]
 
-    entities: list[SensorEntity] = []
+    # Entities keyed by user_id / role slug, touched only on additions/removals
+    user_sensors: dict[str, OnboardUserNotifiersSensor] = {}
+    role_sensors: dict[str, OnboardActiveNotifiersRoleSensor] = {}
 
     # Create per-user notifiers sensors
-    for user_id, user_data in coordinator.data["users"].items():
-        entities.append(OnboardUserNotifiersSensor(coordinator, config_entry, user_id))
-
-    # Create aggregate sensors
-    entities.append(OnboardActiveNotifiersAllSensor(coordinator, config_entry))
+    for user_id in coordinator.data["users"]:
+        user_sensors[user_id] = OnboardUserNotifiersSensor(
+            coordinator, config_entry, user_id
+        )
 
-    for role in coordinator.data["roles"]:
-        entities.append(
-            OnboardActiveNotifiersRoleSensor(coordinator, config_entry, role["slug"])
+    for role_slug in coordinator.data["role_catalog"].slugs:
+        role_sensors[role_slug] = OnboardActiveNotifiersRoleSensor(
+            coordinator, config_entry, role_slug
         )
 
+    # Create aggregate sensors
+    entities: list[SensorEntity] = [
+        *user_sensors.values(),
+        OnboardActiveNotifiersAllSensor(coordinator, config_entry),
+        *role_sensors.values(),
+        OnboardNotifyQueueDepthSensor(dispatcher, config_entry),
+        OnboardNotifyLatencySensor(dispatcher, config_entry),
+        OnboardNotifySuppressedSensor(dispatcher, config_entry),
+        OnboardNotifyDroppedSensor(dispatcher, config_entry),
+    ]
+
+    # Delivery sensors are added further down and as notifiers are used
+    async_remove_orphaned_entities(
+        hass, config_entry, "sensor", entities, keep_prefixes=("delivery_",)
+    )
     async_add_entities(entities)
 
-    # Register platform update callback to handle user additions/removals
+    # Register platform update callback to handle user/role additions/removals
     @callback
     def async_add_remove_entities() -> None:
         """Add or remove entities based on coordinator data."""
-        current_users = coordinator.data.get("users", {})
-        current_roles = coordinator.data.get("roles", [])
-
-        # Get existing entity user IDs
-        existing_user_ids = {
-            entity.user_id
-            for entity in entities
-            if isinstance(entity, OnboardUserNotifiersSensor)
-        }
-
-        # Get existing role slugs
-        existing_role_slugs = {
-            entity.role_slug
-            for entity in entities
-            if isinstance(entity, OnboardActiveNotifiersRoleSensor)
-        }
-
-        new_entities = []
+        data = coordinator.data
+        new_entities: list[SensorEntity] = []
+        removed_entities: list[SensorEntity] = []
 
         # Add sensors for new users
-        for user_id in current_users:
-            if user_id not in existing_user_ids:
-                new_entities.append(
-                    OnboardUserNotifiersSensor(coordinator, config_entry, user_id)
+        for user_id in data.get("added_user_ids", ()):
+            if user_id not in user_sensors:
+                user_sensors[user_id] = OnboardUserNotifiersSensor(
+                    coordinator, config_entry, user_id
                 )
-
-        # Add sensors for new roles
-        current_role_slugs = {role["slug"] for role in current_roles}
-        for role_slug in current_role_slugs:
-            if role_slug not in existing_role_slugs:
-                new_entities.append(
-                    OnboardActiveNotifiersRoleSensor(
-                        coordinator, config_entry, role_slug
-                    )
+                new_entities.append(user_sensors[user_id])
+
+        # Remove sensors of deleted users
+        for user_id in data.get("removed_user_ids", ()):
+            if user_id in user_sensors:
+                removed_entities.append(user_sensors.pop(user_id))
+
+        # Add sensors for new roles, remove sensors of deleted roles
+        role_catalog = data["role_catalog"]
+        for role_slug in role_catalog.slugs:
+            if role_slug not in role_sensors:
+                role_sensors[role_slug] = OnboardActiveNotifiersRoleSensor(
+                    coordinator, config_entry, role_slug
                 )
+                new_entities.append(role_sensors[role_slug])
+        for role_slug in [r for r in role_sensors if r not in role_catalog]:
+            removed_entities.append(role_sensors.pop(role_slug))
 
         if new_entities:
             async_add_entities(new_entities)
-            entities.extend(new_entities)
+        if removed_entities:
+            async_remove_entities(hass, removed_entities)
 
     # Listen for coordinator updates
     config_entry.async_on_unload(
         coordinator.async_add_listener(async_add_remove_entities)
     )
 
+    # Delivery sensors (disabled by default) for the active notifiers, and
+    # for every other notifier once something has been sent to it
+    delivery_sensors: dict[str, OnboardNotifierDeliverySensor] = {}
 
-class OnboardUserNotifiersSensor(CoordinatorEntity, SensorEntity):
+    @callback
+    def async_add_delivery_sensors(notifiers: Iterable[str]) -> None:
+        """Add delivery sensors for notifiers that don't have one yet."""
+        new_entities = [
+            delivery_sensors.setdefault(
+                notifier,
+                OnboardNotifierDeliverySensor(dispatcher, config_entry, notifier),
+            )
+            for notifier in notifiers
+            if notifier not in delivery_sensors
+        ]
+        if new_entities:
+            async_add_entities(new_entities)
+
+    @callback
+    def async_add_new_delivery_sensors() -> None:
+        """Add delivery sensors for notifiers that were sent to for the first time."""
+        new_notifiers = dispatcher.metrics.new_notifiers
+        if new_notifiers:
+            async_add_delivery_sensors(sorted(new_notifiers))
+            new_notifiers.clear()
+
+    async_add_delivery_sensors(coordinator.data["active_notifiers_all"])
+    config_entry.async_on_unload(
+        dispatcher.async_add_listener(async_add_new_delivery_sensors)
+    )
+
+
+class NotifiersSensorBase(CoordinatorEntity, SensorEntity):
+    """
+    Base for sensors whose state is a JSON list of notifiers.
+
+    The serialized state and attributes are cached and only rebuilt when the
+    fingerprint of their inputs changes; coordinator updates that leave the
+    fingerprint unchanged do not write state. Aggregate lists are replaced by
+    a new list whenever they change, so their identity is their fingerprint
+    (the attributes keep the list alive, so its id is not reused).
+    """
+
+    _fingerprint: tuple[Any, ...] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if self._update_attrs():
+            super()._handle_coordinator_update()
+
+    def _fingerprint_changed(self, fingerprint: tuple[Any, ...]) -> bool:
+        """Store a new input fingerprint and return whether it changed."""
+        fingerprint = (self.coordinator.last_update_success, *fingerprint)
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        return True
+
+    @abstractmethod
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+
+
+class OnboardUserNotifiersSensor(NotifiersSensorBase):
     """Sensor showing notifiers configured for a specific user."""
 
     def __init__(
@@ -104,7 +193,7 @@ class OnboardUserNotifiersSensor(CoordinatorEntity, SensorEntity):
         user_id: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=user_context(user_id))
         self.user_id = user_id
         self._attr_has_entity_name = False
 
@@ -113,30 +202,32 @@ class OnboardUserNotifiersSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = None  # Will be set in _update_attrs
 
         # Set entity_id suggestion
-        user_data = coordinator.data["users"].get(user_id, {})
-        name = user_data.get("name", "Unknown")
         self.entity_id = f"sensor.{ENTITY_PREFIX}_notifiers_{short_id}"
 
         self._update_attrs()
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._update_attrs()
-        super()._handle_coordinator_update()
-
-    def _update_attrs(self) -> None:
-        """Update sensor attributes."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             # User no longer exists
+            if not self._fingerprint_changed((False,)):
+                return False
             self._attr_available = False
-            return
+            return True
+
+        name = user.name
+        notifiers = user.notifiers
+        role = user.role
+        onboard = user.onboard
+        notify = user.notify
+        if not self._fingerprint_changed(
+            (True, name, notifiers, role, onboard, notify)
+        ):
+            return False
 
         self._attr_available = True
-        name = user_data.get("name", "Unknown")
-        notifiers = user_data.get("notifiers", [])
 
         # Set friendly name
         self._attr_name = f"{name} Notifiers"
@@ -146,16 +237,17 @@ class OnboardUserNotifiersSensor(CoordinatorEntity, SensorEntity):
 
         # Attributes
         self._attr_extra_state_attributes = {
-            "notifiers": notifiers,
+            "notifiers": list(notifiers),
             "user_id": self.user_id,
             "name": name,
-            "role": user_data.get("role", ""),
-            "onboard": user_data.get("onboard", False),
-            "notify": user_data.get("notify", True),
+            "role": role,
+            "onboard": onboard,
+            "notify": notify,
         }
+        return True
 
 
-class OnboardActiveNotifiersAllSensor(CoordinatorEntity, SensorEntity):
+class OnboardActiveNotifiersAllSensor(NotifiersSensorBase):
     """Sensor showing all active notifiers."""
 
     def __init__(
@@ -164,22 +256,20 @@ class OnboardActiveNotifiersAllSensor(CoordinatorEntity, SensorEntity):
         config_entry: ConfigEntry,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=CONTEXT_ALL)
         self._attr_has_entity_name = False
         self._attr_unique_id = f"{config_entry.entry_id}_active_notifiers_all"
         self._attr_name = "Active Notifiers (All)"
         self.entity_id = f"sensor.{ENTITY_PREFIX}_active_notifiers_all"
         self._update_attrs()
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._update_attrs()
-        super()._handle_coordinator_update()
-
-    def _update_attrs(self) -> None:
-        """Update sensor attributes."""
-        active_notifiers = self.coordinator.data.get("active_notifiers_all", [])
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        active_notifiers = self.coordinator.data.get(
+            "active_notifiers_all", NO_NOTIFIERS
+        )
+        if not self._fingerprint_changed((id(active_notifiers),)):
+            return False
 
         # State is JSON list string
         self._attr_native_value = json.dumps(active_notifiers)
@@ -189,9 +279,10 @@ class OnboardActiveNotifiersAllSensor(CoordinatorEntity, SensorEntity):
             "notifiers": active_notifiers,
             "count": len(active_notifiers),
         }
+        return True
 
 
-class OnboardActiveNotifiersRoleSensor(CoordinatorEntity, SensorEntity):
+class OnboardActiveNotifiersRoleSensor(NotifiersSensorBase):
     """Sensor showing active notifiers for a specific role."""
 
     def __init__(
@@ -201,41 +292,31 @@ class OnboardActiveNotifiersRoleSensor(CoordinatorEntity, SensorEntity):
         role_slug: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=role_context(role_slug))
         self.role_slug = role_slug
         self._attr_has_entity_name = False
         self._attr_unique_id = f"{config_entry.entry_id}_active_notifiers_role_{role_slug}"
 
-        # Get role label
-        role_label = role_slug
-        for role in coordinator.data.get("roles", []):
-            if role["slug"] == role_slug:
-                role_label = role["label"]
-                break
-
+        role_label = coordinator.data["role_catalog"].label(role_slug)
         self._attr_name = f"Active Notifiers (Role: {role_label})"
         self.entity_id = f"sensor.{ENTITY_PREFIX}_active_notifiers_role_{role_slug}"
         self._update_attrs()
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
         # Check if role still exists
-        current_role_slugs = {
-            role["slug"] for role in self.coordinator.data.get("roles", [])
-        }
-        if self.role_slug not in current_role_slugs:
+        if self.role_slug not in self.coordinator.data["role_catalog"]:
+            if not self._fingerprint_changed((False,)):
+                return False
             self._attr_available = False
-        else:
-            self._attr_available = True
-            self._update_attrs()
-
-        super()._handle_coordinator_update()
+            return True
 
-    def _update_attrs(self) -> None:
-        """Update sensor attributes."""
         active_by_role = self.coordinator.data.get("active_notifiers_by_role", {})
-        active_notifiers = active_by_role.get(self.role_slug, [])
+        active_notifiers = active_by_role.get(self.role_slug, NO_NOTIFIERS)
+        if not self._fingerprint_changed((True, id(active_notifiers))):
+            return False
+
+        self._attr_available = True
 
         # State is JSON list string
         self._attr_native_value = json.dumps(active_notifiers)
@@ -246,3 +327,197 @@ class OnboardActiveNotifiersRoleSensor(CoordinatorEntity, SensorEntity):
             "role": self.role_slug,
             "count": len(active_notifiers),
         }
+        return True
+
+
+class NotifyQueueSensorBase(SensorEntity):
+    """Base for diagnostic sensors of the outbound notification queue."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, dispatcher: NotifyDispatcher) -> None:
+        """Initialize the sensor."""
+        self._dispatcher = dispatcher
+        self._update_attrs()
+
+    async def async_added_to_hass(self) -> None:
+        """Listen for queue changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._dispatcher.async_add_listener(self._handle_dispatcher_update)
+        )
+
+    @callback
+    def _handle_dispatcher_update(self) -> None:
+        """Handle a queue change."""
+        if self._update_attrs():
+            self.async_write_ha_state()
+
+    @abstractmethod
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+
+
+class OnboardNotifyQueueDepthSensor(NotifyQueueSensorBase):
+    """Sensor showing the number of queued notifications."""
+
+    def __init__(
+        self,
+        dispatcher: NotifyDispatcher,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._attr_unique_id = f"{config_entry.entry_id}_notify_queue_depth"
+        self._attr_name = "Notify Queue Depth"
+        self.entity_id = f"sensor.{ENTITY_PREFIX}_notify_queue_depth"
+        super().__init__(dispatcher)
+
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        depth = self._dispatcher.queue_depth
+        attributes = {
+            "retrying": self._dispatcher.retry_depth,
+            "dead_letters": len(self._dispatcher.dead_letters),
+        }
+        if depth == self._attr_native_value and attributes == getattr(
+            self, "_attr_extra_state_attributes", None
+        ):
+            return False
+        self._attr_native_value = depth
+        self._attr_extra_state_attributes = attributes
+        return True
+
+
+class OnboardNotifyLatencySensor(NotifyQueueSensorBase):
+    """Sensor showing the mean latency of recent notification deliveries."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+
+    def __init__(
+        self,
+        dispatcher: NotifyDispatcher,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._attr_unique_id = f"{config_entry.entry_id}_notify_latency"
+        self._attr_name = "Notify Latency"
+        self.entity_id = f"sensor.{ENTITY_PREFIX}_notify_latency"
+        super().__init__(dispatcher)
+
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        latency = self._dispatcher.latency
+        max_latency = self._dispatcher.max_latency
+        value = None if latency is None else round(latency * 1000, 1)
+        attributes = {
+            "max": None if max_latency is None else round(max_latency * 1000, 1)
+        }
+        if value == self._attr_native_value and attributes == getattr(
+            self, "_attr_extra_state_attributes", None
+        ):
+            return False
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        return True
+
+
+class OnboardNotifySuppressedSensor(NotifyQueueSensorBase):
+    """Sensor counting duplicate notifications that were dropped."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(
+        self,
+        dispatcher: NotifyDispatcher,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._attr_unique_id = f"{config_entry.entry_id}_notify_suppressed"
+        self._attr_name = "Notify Suppressed Duplicates"
+        self.entity_id = f"sensor.{ENTITY_PREFIX}_notify_suppressed"
+        super().__init__(dispatcher)
+
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        suppressed = self._dispatcher.suppressed
+        if suppressed == self._attr_native_value:
+            return False
+        self._attr_native_value = suppressed
+        return True
+
+
+class OnboardNotifyDroppedSensor(NotifyQueueSensorBase):
+    """Sensor counting notifications dropped because a queue was full."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(
+        self,
+        dispatcher: NotifyDispatcher,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        self._attr_unique_id = f"{config_entry.entry_id}_notify_dropped"
+        self._attr_name = "Notify Dropped"
+        self.entity_id = f"sensor.{ENTITY_PREFIX}_notify_dropped"
+        super().__init__(dispatcher)
+
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        dropped = self._dispatcher.dropped
+        if dropped == self._attr_native_value:
+            return False
+        self._attr_native_value = dropped
+        return True
+
+
+class OnboardNotifierDeliverySensor(NotifyQueueSensorBase):
+    """Sensor showing the delivery statistics of a single notifier."""
+
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+    _fingerprint: tuple[int, int, int, int] | None = None
+
+    def __init__(
+        self,
+        dispatcher: NotifyDispatcher,
+        config_entry: ConfigEntry,
+        notifier: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self.notifier = notifier
+        self._attr_unique_id = f"{config_entry.entry_id}_delivery_{notifier}"
+        self._attr_name = f"Delivery {notifier}"
+        self.entity_id = (
+            f"sensor.{ENTITY_PREFIX}_delivery_{slugify(notifier.removeprefix('notify.'))}"
+        )
+        super().__init__(dispatcher)
+
+    def _update_attrs(self) -> bool:
+        """Update sensor attributes, returning whether they changed."""
+        stats = self._dispatcher.metrics.notifiers.get(self.notifier)
+        if stats is None:
+            return False
+        latency = stats.latency
+        fingerprint = (stats.sent, stats.failed, stats.suppressed, stats.dropped)
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+
+        mean = latency.mean
+        self._attr_native_value = None if mean is None else round(mean, 1)
+        self._attr_extra_state_attributes = {
+            "sent": stats.sent,
+            "failed": stats.failed,
+            "suppressed": stats.suppressed,
+            "dropped": stats.dropped,
+            "p50": latency.percentile(0.5),
+            "p95": latency.percentile(0.95),
+            "max": round(latency.max, 1),
+        }
+        return True
@@ -1,6 +1,8 @@
 """Services for Onboard Manager."""
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections.abc import Awaitable, Callable, Mapping
 import logging
 from typing import Any
 
@@ -15,17 +17,45 @@ from .const import (
     NOTIFIER_MODE_REMOVE,
     NOTIFIER_MODE_REPLACE,
     SERVICE_EXPORT_STATE,
+    SERVICE_FLUSH,
+    SERVICE_GET_CHANGES,
+    SERVICE_GET_DELIVERY_METRICS,
+    SERVICE_LIST_DEAD_LETTERS,
     SERVICE_RELOAD_USERS,
+    SERVICE_REPLAY_DEAD_LETTERS,
     SERVICE_SET_USER,
     SERVICE_SET_USER_NOTIFIERS,
+    SERVICE_SET_USERS,
+    SERVICE_SET_USERS_NOTIFIERS,
 )
 from .coordinator import OnboardManagerCoordinator
-from .user_registry import parse_notifiers_input, resolve_user_id
+from .dispatch import NotifyDispatcher
+from .models import RoleCatalog, UserRecord
+from .user_registry import (
+    AmbiguousUsernameError,
+    UserAttributeIndex,
+    parse_notifiers_input,
+    resolve_user_id,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+NOTIFIER_MODES = [NOTIFIER_MODE_REPLACE, NOTIFIER_MODE_ADD, NOTIFIER_MODE_REMOVE]
+
+# Config entry a call is for, only needed when several entries are loaded
+ATTR_ENTRY_ID = "entry_id"
+ATTR_CONFIG_ENTRY = "config_entry"
+ENTRY_FIELDS = {
+    vol.Exclusive(ATTR_ENTRY_ID, "entry"): cv.string,
+    vol.Exclusive(ATTR_CONFIG_ENTRY, "entry"): cv.string,
+}
+
+ENTRY_FIELD_KEYS = {ATTR_ENTRY_ID, ATTR_CONFIG_ENTRY}
+
+SERVICE_ENTRY_SCHEMA = vol.Schema(ENTRY_FIELDS)
+
 # Service schemas
-SERVICE_SET_USER_SCHEMA = vol.Schema(
+USER_SETTINGS_SCHEMA = vol.Schema(
     {
         vol.Optional("user_id"): cv.string,
         vol.Optional("username"): cv.string,
@@ -35,28 +65,306 @@ SERVICE_SET_USER_SCHEMA = vol.Schema(
     }
 )
 
+SERVICE_SET_USER_SCHEMA = USER_SETTINGS_SCHEMA.extend(ENTRY_FIELDS)
+
 SERVICE_SET_USER_NOTIFIERS_SCHEMA = vol.Schema(
     {
+        **ENTRY_FIELDS,
         vol.Optional("user_id"): cv.string,
         vol.Optional("username"): cv.string,
         vol.Required("notifiers"): vol.Any(cv.string, [cv.string]),
-        vol.Optional("mode", default=NOTIFIER_MODE_REPLACE): vol.In(
-            [NOTIFIER_MODE_REPLACE, NOTIFIER_MODE_ADD, NOTIFIER_MODE_REMOVE]
-        ),
+        vol.Optional("mode", default=NOTIFIER_MODE_REPLACE): vol.In(NOTIFIER_MODES),
+    }
+)
+
+# Selects users by their current state instead of listing them
+USER_FILTER_SCHEMA = vol.Schema(
+    {
+        vol.Optional("role"): cv.string,
+        vol.Optional("onboard"): cv.boolean,
+        vol.Optional("notify"): cv.boolean,
     }
 )
 
+SERVICE_SET_USERS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **ENTRY_FIELDS,
+            vol.Exclusive("users", "target"): [USER_SETTINGS_SCHEMA],
+            vol.Exclusive("filter", "target"): USER_FILTER_SCHEMA,
+            vol.Optional("onboard"): cv.boolean,
+            vol.Optional("notify"): cv.boolean,
+            vol.Optional("role"): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key("users", "filter"),
+)
 
-def register_services(hass: HomeAssistant, coordinator: OnboardManagerCoordinator) -> None:
-    """Register services for onboard manager."""
+SERVICE_SET_USERS_NOTIFIERS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            **ENTRY_FIELDS,
+            vol.Exclusive("users", "target"): [
+                vol.Schema(
+                    {
+                        vol.Optional("user_id"): cv.string,
+                        vol.Optional("username"): cv.string,
+                        vol.Optional("notifiers"): vol.Any(cv.string, [cv.string]),
+                        vol.Optional("mode"): vol.In(NOTIFIER_MODES),
+                    }
+                )
+            ],
+            vol.Exclusive("filter", "target"): USER_FILTER_SCHEMA,
+            vol.Optional("notifiers"): vol.Any(cv.string, [cv.string]),
+            vol.Optional("mode", default=NOTIFIER_MODE_REPLACE): vol.In(NOTIFIER_MODES),
+        }
+    ),
+    cv.has_at_least_one_key("users", "filter"),
+)
 
-    async def handle_set_user(call: ServiceCall) -> None:
-        """Handle set_user service call."""
-        user_id = await resolve_user_id(
-            hass,
-            call.data.get("user_id"),
-            call.data.get("username"),
+EXPORT_USER_FIELDS = ("name", "onboard", "notify", "role", "notifiers")
+
+# Without any of these (besides the entry) the full state is exported as before
+SERVICE_EXPORT_STATE_SCHEMA = vol.Schema(
+    {
+        **ENTRY_FIELDS,
+        vol.Optional("role"): cv.string,
+        vol.Optional("onboard"): cv.boolean,
+        vol.Optional("notify"): cv.boolean,
+        vol.Optional("user_ids"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("fields"): vol.All(cv.ensure_list, [vol.In(EXPORT_USER_FIELDS)]),
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional("cursor"): cv.string,
+    }
+)
+
+SERVICE_GET_CHANGES_SCHEMA = vol.Schema(
+    {
+        **ENTRY_FIELDS,
+        vol.Required("since"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("epoch"): cv.string,
+    }
+)
+
+SERVICE_REPLAY_DEAD_LETTERS_SCHEMA = vol.Schema(
+    {
+        **ENTRY_FIELDS,
+        vol.Optional("ids"): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+USER_FIELDS = ("onboard", "notify", "role")
+NOTIFIER_FIELDS = ("notifiers", "mode")
+
+
+def _build_user_updates(
+    data: Mapping[str, Any], role_catalog: RoleCatalog
+) -> dict[str, Any]:
+    """Build validated user updates, raising ValueError on invalid input."""
+    updates: dict[str, Any] = {}
+
+    if "onboard" in data:
+        updates["onboard"] = data["onboard"]
+
+    if "notify" in data:
+        updates["notify"] = data["notify"]
+
+    if "role" in data:
+        # Validate role exists (by slug or label)
+        role_slug = role_catalog.resolve(data["role"])
+        if not role_slug:
+            raise ValueError(f"Invalid role: {data['role']}")
+        updates["role"] = role_slug
+
+    return updates
+
+
+def _apply_notifier_mode(
+    current_notifiers: list[str], notifiers: Any, mode: str
+) -> list[str]:
+    """Apply a notifier update mode, raising ValueError on invalid input."""
+    # Parse new notifiers
+    new_notifiers = parse_notifiers_input(notifiers)
+
+    if mode == NOTIFIER_MODE_REPLACE:
+        return new_notifiers
+    if mode == NOTIFIER_MODE_ADD:
+        # Add new notifiers that aren't already present
+        updated_notifiers = current_notifiers.copy()
+        for notifier in new_notifiers:
+            if notifier not in updated_notifiers:
+                updated_notifiers.append(notifier)
+        return updated_notifiers
+    if mode == NOTIFIER_MODE_REMOVE:
+        # Remove specified notifiers
+        return [n for n in current_notifiers if n not in new_notifiers]
+
+    raise ValueError(f"Invalid mode: {mode}")
+
+
+def _filter_user_ids(
+    attribute_index: UserAttributeIndex,
+    role_catalog: RoleCatalog,
+    user_filter: Mapping[str, Any],
+    user_ids: list[str] | None = None,
+) -> list[str]:
+    """Return the sorted users matching a filter, raising ValueError on invalid input."""
+    criteria = {
+        key: user_filter[key] for key in UserAttributeIndex.FIELDS if key in user_filter
+    }
+    if "role" in criteria:
+        role_slug = role_catalog.resolve(criteria["role"])
+        if not role_slug:
+            raise ValueError(f"Invalid role: {criteria['role']}")
+        criteria["role"] = role_slug
+
+    return attribute_index.select(criteria, user_ids)
+
+
+def _export_user(user: UserRecord, fields: list[str] | None) -> dict[str, Any]:
+    """Return the exported form of a user, limited to the given fields."""
+    if fields is None:
+        return user.as_dict()
+    exported: dict[str, Any] = {"user_id": user.user_id}
+    for field in fields:
+        value = getattr(user, field)
+        exported[field] = list(value) if field == "notifiers" else value
+    return exported
+
+
+def _batch_targets(
+    coordinator: OnboardManagerCoordinator,
+    data: Mapping[str, Any],
+    fields: tuple[str, ...],
+) -> list[tuple[str | None, dict[str, Any], dict[str, Any]]]:
+    """
+    Resolve the users targeted by a batch service call.
+
+    Returns (user_id, result, entry) per target, where entry holds the
+    requested values (call-level values are defaults for every user) and
+    result is the per-user service response, carrying an error if the user
+    could not be resolved.
+    """
+    users = coordinator.data.get("users", {})
+    role_catalog = coordinator.data["role_catalog"]
+    defaults = {key: data[key] for key in fields if key in data}
+
+    if "filter" in data:
+        try:
+            user_ids = _filter_user_ids(
+                coordinator.attribute_index, role_catalog, data["filter"]
+            )
+        except ValueError as err:
+            return [(None, {"status": "error", "error": str(err)}, {})]
+        return [(user_id, {"user_id": user_id}, defaults) for user_id in user_ids]
+
+    targets: list[tuple[str | None, dict[str, Any], dict[str, Any]]] = []
+    for entry in data["users"]:
+        result: dict[str, Any]
+        # An ambiguous username reports the users it matches
+        try:
+            user_id = resolve_user_id(
+                coordinator.name_index,
+                entry.get("user_id"),
+                entry.get("username"),
+            )
+        except AmbiguousUsernameError as err:
+            user_id = None
+            result = {
+                "username": entry.get("username"),
+                "status": "error",
+                "error": str(err),
+                "user_ids": err.user_ids,
+            }
+        else:
+            if not user_id:
+                result = {
+                    "username": entry.get("username"),
+                    "status": "error",
+                    "error": "Could not resolve user_id or username",
+                }
+            elif user_id not in users:
+                result = {
+                    "user_id": user_id,
+                    "status": "error",
+                    "error": "User not found in onboard manager",
+                }
+            else:
+                result = {"user_id": user_id}
+        targets.append(
+            (user_id, result, {**defaults, **{k: entry[k] for k in fields if k in entry}})
         )
+    return targets
+
+
+def _batch_response(
+    results: list[dict[str, Any]], applied: bool
+) -> dict[str, Any]:
+    """Build the service response of a batch service call."""
+    return {
+        "applied": applied,
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "results": results,
+    }
+
+
+def _entry_data_for_call(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Return the data of the config entry a call is for, raising ValueError."""
+    loaded_entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_ENTRY_ID) or call.data.get(ATTR_CONFIG_ENTRY)
+    if entry_id is None:
+        if len(loaded_entries) == 1:
+            return next(iter(loaded_entries.values()))
+        raise ValueError(
+            f"Several onboard manager entries are loaded, set {ATTR_ENTRY_ID}"
+        )
+    if entry_id not in loaded_entries:
+        raise ValueError(f"Onboard manager entry {entry_id} is not loaded")
+    return loaded_entries[entry_id]
+
+
+def register_services(hass: HomeAssistant) -> None:
+    """Register services for onboard manager.
+
+    Services are registered once for all config entries, and each call is
+    handled by the coordinator and dispatcher of the entry it names.
+    """
+
+    def _routed(
+        handler: Callable[
+            [ServiceCall, OnboardManagerCoordinator, NotifyDispatcher],
+            Awaitable[ServiceResponse],
+        ],
+    ) -> Callable[[ServiceCall], Awaitable[ServiceResponse]]:
+        """Wrap a handler to pass the objects of the call's config entry."""
+
+        async def async_handle(call: ServiceCall) -> ServiceResponse:
+            try:
+                entry_data = _entry_data_for_call(hass, call)
+            except ValueError as err:
+                _LOGGER.error(str(err))
+                return {"error": str(err)} if call.return_response else None
+            return await handler(
+                call, entry_data["coordinator"], entry_data["dispatcher"]
+            )
+
+        return async_handle
+
+    async def handle_set_user(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> None:
+        """Handle set_user service call."""
+        try:
+            user_id = resolve_user_id(
+                coordinator.name_index,
+                call.data.get("user_id"),
+                call.data.get("username"),
+            )
+        except AmbiguousUsernameError as err:
+            _LOGGER.error(str(err))
+            return
 
         if not user_id:
             _LOGGER.error("Could not resolve user_id or username")
@@ -69,50 +377,33 @@ def register_services(hass: HomeAssistant, coordinator: OnboardManagerCoordinato
             return
 
         # Build updates
-        updates = {}
-
-        if "onboard" in call.data:
-            updates["onboard"] = call.data["onboard"]
-
-        if "notify" in call.data:
-            updates["notify"] = call.data["notify"]
-
-        if "role" in call.data:
-            role_input = call.data["role"]
-            # Validate role exists (by slug or label)
-            roles = coordinator.data.get("roles", [])
-            role_slug = None
-
-            # Try to match by slug first
-            for role in roles:
-                if role["slug"] == role_input.lower():
-                    role_slug = role["slug"]
-                    break
-
-            # Try to match by label
-            if not role_slug:
-                for role in roles:
-                    if role["label"].lower() == role_input.lower():
-                        role_slug = role["slug"]
-                        break
-
-            if role_slug:
-                updates["role"] = role_slug
-            else:
-                _LOGGER.error(f"Invalid role: {role_input}")
-                return
+        try:
+            updates = _build_user_updates(
+                call.data, coordinator.data["role_catalog"]
+            )
+        except ValueError as err:
+            _LOGGER.error(str(err))
+            return
 
         if updates:
             await coordinator.async_update_user(user_id, updates)
             _LOGGER.info(f"Updated user {user_id}: {updates}")
 
-    async def handle_set_user_notifiers(call: ServiceCall) -> None:
+    async def handle_set_user_notifiers(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> None:
         """Handle set_user_notifiers service call."""
-        user_id = await resolve_user_id(
-            hass,
-            call.data.get("user_id"),
-            call.data.get("username"),
-        )
+        try:
+            user_id = resolve_user_id(
+                coordinator.name_index,
+                call.data.get("user_id"),
+                call.data.get("username"),
+            )
+        except AmbiguousUsernameError as err:
+            _LOGGER.error(str(err))
+            return
 
         if not user_id:
             _LOGGER.error("Could not resolve user_id or username")
@@ -124,74 +415,335 @@ def register_services(hass: HomeAssistant, coordinator: OnboardManagerCoordinato
             _LOGGER.error(f"User {user_id} not found in onboard manager")
             return
 
-        user_data = users[user_id]
-        current_notifiers = user_data.get("notifiers", [])
-
-        # Parse new notifiers
-        new_notifiers = parse_notifiers_input(call.data["notifiers"])
-        mode = call.data.get("mode", NOTIFIER_MODE_REPLACE)
+        current_notifiers = list(users[user_id].notifiers)
 
         # Apply mode
-        if mode == NOTIFIER_MODE_REPLACE:
-            updated_notifiers = new_notifiers
-        elif mode == NOTIFIER_MODE_ADD:
-            # Add new notifiers that aren't already present
-            updated_notifiers = current_notifiers.copy()
-            for notifier in new_notifiers:
-                if notifier not in updated_notifiers:
-                    updated_notifiers.append(notifier)
-        elif mode == NOTIFIER_MODE_REMOVE:
-            # Remove specified notifiers
-            updated_notifiers = [
-                n for n in current_notifiers if n not in new_notifiers
-            ]
-        else:
-            _LOGGER.error(f"Invalid mode: {mode}")
+        try:
+            updated_notifiers = _apply_notifier_mode(
+                current_notifiers,
+                call.data["notifiers"],
+                call.data.get("mode", NOTIFIER_MODE_REPLACE),
+            )
+        except ValueError as err:
+            _LOGGER.error(str(err))
             return
 
         await coordinator.async_update_user(user_id, {"notifiers": updated_notifiers})
         _LOGGER.info(f"Updated notifiers for user {user_id}: {updated_notifiers}")
 
-    async def handle_reload_users(call: ServiceCall) -> None:
+    async def handle_set_users(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle set_users service call.
+
+        All entries are validated before anything is changed; if any entry is
+        invalid, no user is updated.
+        """
+        users = coordinator.data.get("users", {})
+        role_catalog = coordinator.data["role_catalog"]
+        targets = _batch_targets(coordinator, call.data, USER_FIELDS)
+
+        updates: dict[str, dict[str, Any]] = {}
+        for user_id, result, entry in targets:
+            if "error" in result:
+                continue
+            try:
+                user_updates = _build_user_updates(entry, role_catalog)
+            except ValueError as err:
+                result.update(status="error", error=str(err))
+                continue
+
+            pending = updates.get(user_id, {})
+            changes = {
+                key: value
+                for key, value in user_updates.items()
+                if pending.get(key, getattr(users[user_id], key)) != value
+            }
+            if changes:
+                updates.setdefault(user_id, {}).update(changes)
+            result.update(status="updated" if changes else "unchanged", changes=changes)
+
+        results = [result for _, result, _ in targets]
+        if any(result["status"] == "error" for result in results):
+            _LOGGER.error("Not updating users, invalid entries in set_users call")
+            return _batch_response(results, applied=False)
+
+        await coordinator.async_update_users(updates)
+        _LOGGER.info(f"Updated {len(updates)} users")
+        return _batch_response(results, applied=True)
+
+    async def handle_set_users_notifiers(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle set_users_notifiers service call.
+
+        All entries are validated before anything is changed; if any entry is
+        invalid, no user is updated.
+        """
+        users = coordinator.data.get("users", {})
+        targets = _batch_targets(coordinator, call.data, NOTIFIER_FIELDS)
+
+        updates: dict[str, dict[str, Any]] = {}
+        for user_id, result, entry in targets:
+            if "error" in result:
+                continue
+            if "notifiers" not in entry:
+                result.update(status="error", error="No notifiers given")
+                continue
+
+            current_notifiers = updates.get(user_id, {}).get(
+                "notifiers", list(users[user_id].notifiers)
+            )
+            try:
+                updated_notifiers = _apply_notifier_mode(
+                    current_notifiers,
+                    entry["notifiers"],
+                    entry.get("mode", NOTIFIER_MODE_REPLACE),
+                )
+            except ValueError as err:
+                result.update(status="error", error=str(err))
+                continue
+
+            changed = updated_notifiers != current_notifiers
+            if changed:
+                updates[user_id] = {"notifiers": updated_notifiers}
+            result.update(
+                status="updated" if changed else "unchanged",
+                notifiers=updated_notifiers,
+            )
+
+        results = [result for _, result, _ in targets]
+        if any(result["status"] == "error" for result in results):
+            _LOGGER.error(
+                "Not updating notifiers, invalid entries in set_users_notifiers call"
+            )
+            return _batch_response(results, applied=False)
+
+        await coordinator.async_update_users(updates)
+        _LOGGER.info(f"Updated notifiers for {len(updates)} users")
+        return _batch_response(results, applied=True)
+
+    async def handle_reload_users(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> None:
         """Handle reload_users service call."""
         await coordinator.async_reload_users()
         _LOGGER.info("Reloaded users")
 
-    async def handle_export_state(call: ServiceCall) -> ServiceResponse:
+    async def handle_export_state(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
         """Handle export_state service call."""
         data = coordinator.data
+        if call.data.keys() - ENTRY_FIELD_KEYS:
+            return _export_users(coordinator, call.data)
         return {
+            "revision": coordinator.storage.revision,
+            "epoch": coordinator.storage.epoch,
             "roles": data.get("roles", []),
-            "users": data.get("users", {}),
+            "users": {
+                user_id: user.as_dict()
+                for user_id, user in data.get("users", {}).items()
+            },
             "active_notifiers_all": data.get("active_notifiers_all", []),
             "active_notifiers_by_role": data.get("active_notifiers_by_role", {}),
         }
 
+    def _export_users(
+        coordinator: OnboardManagerCoordinator, query: Mapping[str, Any]
+    ) -> dict[str, Any]:
+        """Export a page of the users matching a query, using the indexes."""
+        data = coordinator.data
+        try:
+            user_ids = _filter_user_ids(
+                coordinator.attribute_index,
+                data["role_catalog"],
+                query,
+                query.get("user_ids"),
+            )
+        except ValueError as err:
+            _LOGGER.error(str(err))
+            return {"error": str(err)}
+
+        start = bisect_right(user_ids, query["cursor"]) if "cursor" in query else 0
+        end = len(user_ids)
+        if "limit" in query:
+            end = min(start + query["limit"], end)
+        users = data["users"]
+        fields = query.get("fields")
+        page = user_ids[start:end]
+        return {
+            "revision": coordinator.storage.revision,
+            "epoch": coordinator.storage.epoch,
+            "users": {user_id: _export_user(users[user_id], fields) for user_id in page},
+            "total": len(user_ids),
+            "next_cursor": page[-1] if page and end < len(user_ids) else None,
+        }
+
+    async def handle_get_changes(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle get_changes service call."""
+        storage = coordinator.storage
+        changes = None
+        # A revision from another epoch may have been reused after a crash
+        if call.data.get("epoch", storage.epoch) == storage.epoch:
+            changes = storage.changes.changes_since(call.data["since"])
+        if changes is None:
+            return {
+                "revision": storage.revision,
+                "epoch": storage.epoch,
+                "resync": True,
+            }
+
+        user_ids, roles_changed = changes
+        response: dict[str, Any] = {
+            "revision": storage.revision,
+            "epoch": storage.epoch,
+            "resync": False,
+            "users": {
+                user_id: user.as_dict() if (user := storage.get_user(user_id)) else None
+                for user_id in sorted(user_ids)
+            },
+        }
+        if roles_changed:
+            response["roles"] = storage.get_roles()
+        return response
+
+    async def handle_flush(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> None:
+        """Handle flush service call."""
+        await coordinator.storage.async_flush()
+        _LOGGER.debug("Flushed pending storage writes")
+
+    async def handle_list_dead_letters(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle list_dead_letters service call."""
+        return {"dead_letters": dispatcher.dead_letters.get_letters()}
+
+    async def handle_replay_dead_letters(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle replay_dead_letters service call."""
+        results = await dispatcher.async_replay_dead_letters(call.data.get("ids"))
+        delivered = sum(1 for result in results if result["status"] == "delivered")
+        _LOGGER.info(f"Replayed {len(results)} dead letters, {delivered} delivered")
+        return {"replayed": len(results), "delivered": delivered, "results": results}
+
+    async def handle_get_delivery_metrics(
+        call: ServiceCall,
+        coordinator: OnboardManagerCoordinator,
+        dispatcher: NotifyDispatcher,
+    ) -> ServiceResponse:
+        """Handle get_delivery_metrics service call."""
+        return {
+            **dispatcher.metrics.as_dict(),
+            "queue_depth": dispatcher.queue_depth,
+            "dropped": dispatcher.dropped,
+            "retrying": dispatcher.retry_depth,
+            "dead_letters": len(dispatcher.dead_letters),
+        }
+
     # Register services
     hass.services.async_register(
         DOMAIN,
         SERVICE_SET_USER,
-        handle_set_user,
+        _routed(handle_set_user),
         schema=SERVICE_SET_USER_SCHEMA,
     )
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_SET_USER_NOTIFIERS,
-        handle_set_user_notifiers,
+        _routed(handle_set_user_notifiers),
         schema=SERVICE_SET_USER_NOTIFIERS_SCHEMA,
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_USERS,
+        _routed(handle_set_users),
+        schema=SERVICE_SET_USERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_USERS_NOTIFIERS,
+        _routed(handle_set_users_notifiers),
+        schema=SERVICE_SET_USERS_NOTIFIERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_RELOAD_USERS,
-        handle_reload_users,
+        _routed(handle_reload_users),
+        schema=SERVICE_ENTRY_SCHEMA,
     )
 
     hass.services.async_register(
         DOMAIN,
         SERVICE_EXPORT_STATE,
-        handle_export_state,
+        _routed(handle_export_state),
+        schema=SERVICE_EXPORT_STATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CHANGES,
+        _routed(handle_get_changes),
+        schema=SERVICE_GET_CHANGES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FLUSH,
+        _routed(handle_flush),
+        schema=SERVICE_ENTRY_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_DEAD_LETTERS,
+        _routed(handle_list_dead_letters),
+        schema=SERVICE_ENTRY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_DEAD_LETTERS,
+        _routed(handle_replay_dead_letters),
+        schema=SERVICE_REPLAY_DEAD_LETTERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_DELIVERY_METRICS,
+        _routed(handle_get_delivery_metrics),
+        schema=SERVICE_ENTRY_SCHEMA,
         supports_response=SupportsResponse.ONLY,
     )
 
@@ -200,5 +752,12 @@ def unregister_services(hass: HomeAssistant) -> None:
     """Unregister services for onboard manager."""
     hass.services.async_remove(DOMAIN, SERVICE_SET_USER)
     hass.services.async_remove(DOMAIN, SERVICE_SET_USER_NOTIFIERS)
+    hass.services.async_remove(DOMAIN, SERVICE_SET_USERS)
+    hass.services.async_remove(DOMAIN, SERVICE_SET_USERS_NOTIFIERS)
     hass.services.async_remove(DOMAIN, SERVICE_RELOAD_USERS)
     hass.services.async_remove(DOMAIN, SERVICE_EXPORT_STATE)
+    hass.services.async_remove(DOMAIN, SERVICE_FLUSH)
+    hass.services.async_remove(DOMAIN, SERVICE_LIST_DEAD_LETTERS)
+    hass.services.async_remove(DOMAIN, SERVICE_REPLAY_DEAD_LETTERS)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_DELIVERY_METRICS)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_CHANGES)
@@ -1,44 +1,388 @@
 """Storage management for Onboard Manager."""
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import replace
 import logging
+import time
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.ulid import ulid_now
 
-from .const import STORAGE_KEY, STORAGE_VERSION
+from .const import (
+    DEAD_LETTER_STORAGE_KEY,
+    DEAD_LETTER_STORAGE_VERSION,
+    DEFAULT_SAVE_DELAY_SECONDS,
+    DEFAULT_SPLIT_STORAGE,
+    MAX_CHANGE_LOG,
+    MAX_DEAD_LETTERS,
+    ROLES_STORAGE_KEY,
+    ROLES_STORAGE_VERSION,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .models import UserRecord
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class ChangeLog:
+    """
+    Bounded log of the revisions at which users and roles changed.
+
+    Entries are (revision, user_id), with None as user_id for a role change.
+    Only what changed is logged; readers look up the current values. Changes
+    older than the log (or made before the last restart) are unknown, and
+    readers asking for them have to resync.
+
+    Revisions are saved with a delay, so after a crash the same revision can
+    be handed out again for different changes. Each log therefore has its
+    own epoch, and a revision is only meaningful together with its epoch.
+    """
+
+    def __init__(self, revision: int = 0, max_entries: int = MAX_CHANGE_LOG) -> None:
+        """Initialize an empty log at a revision."""
+        self.revision = revision
+        self.epoch = ulid_now()
+        self._entries: deque[tuple[int, str | None]] = deque(maxlen=max_entries)
+        # All changes after this revision are in the log
+        self._complete_after = revision
+
+    def record(self, user_id: str | None) -> int:
+        """Record a change of a user (None for the roles) and return its revision."""
+        if len(self._entries) == self._entries.maxlen:
+            self._complete_after = self._entries[0][0]
+        self.revision += 1
+        self._entries.append((self.revision, user_id))
+        return self.revision
+
+    def changes_since(self, revision: int) -> tuple[set[str], bool] | None:
+        """
+        Return the users changed after a revision and whether roles changed.
+
+        Returns None if the changes are no longer known.
+        """
+        if not self._complete_after <= revision <= self.revision:
+            return None
+        user_ids: set[str] = set()
+        roles_changed = False
+        for entry_revision, user_id in reversed(self._entries):
+            if entry_revision <= revision:
+                break
+            if user_id is None:
+                roles_changed = True
+            else:
+                user_ids.add(user_id)
+        return user_ids, roles_changed
+
+
+SECTION_ROLES = "roles"
+SECTION_USERS = "users"
+
+# Active notifiers overall and per role, as published by the coordinator
+Aggregates = tuple[list[str], dict[str, list[str]]]
+
+
+def encode_users(
+    users: dict[str, UserRecord],
+    revision: int,
+    aggregates: Aggregates | None = None,
+) -> dict[str, Any]:
+    """
+    Return the version 2 document of the users.
+
+    Notifier names are stored once in a table and users refer to them by
+    index, in compact rows (see UserRecord.as_row). Aggregates computed from
+    these users may be stored along, so a restart doesn't have to recompute
+    them.
+    """
+    notifier_ids: dict[str, int] = {}
+    rows = {user_id: user.as_row(notifier_ids) for user_id, user in users.items()}
+    data: dict[str, Any] = {"revision": revision, "users": rows}
+    if aggregates is not None:
+        active_all, active_by_role = aggregates
+        data["aggregates"] = {
+            "all": [notifier_ids.setdefault(n, len(notifier_ids)) for n in active_all],
+            "by_role": {
+                role: [notifier_ids.setdefault(n, len(notifier_ids)) for n in notifiers]
+                for role, notifiers in active_by_role.items()
+            },
+        }
+    data["notifiers"] = list(notifier_ids)
+    return data
+
+
+def decode_users(data: dict[str, Any]) -> dict[str, UserRecord]:
+    """Return the users of a version 2 document."""
+    notifiers = data.get("notifiers", [])
+    return {
+        user_id: UserRecord.from_row(user_id, row, notifiers)
+        for user_id, row in data.get("users", {}).items()
+    }
+
+
+def decode_aggregates(data: dict[str, Any]) -> Aggregates | None:
+    """Return the aggregates of a version 2 document, if stored."""
+    if (aggregates := data.get("aggregates")) is None:
+        return None
+    notifiers = data.get("notifiers", [])
+    return (
+        [notifiers[index] for index in aggregates["all"]],
+        {
+            role: [notifiers[index] for index in indexes]
+            for role, indexes in aggregates["by_role"].items()
+        },
+    )
+
+
+def migrate_v1_to_v2(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert a version 1 document (users as full dicts) to version 2."""
+    users = {
+        user_id: UserRecord.from_dict(user_id, user_data)
+        for user_id, user_data in data.get("users", {}).items()
+    }
+    return {
+        **encode_users(users, data.get("revision", 0)),
+        "roles": data.get("roles", []),
+    }
+
+
+class OnboardStore(Store[dict[str, Any]]):
+    """Store of the onboard manager document, migrating older versions."""
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Migrate to the current version."""
+        if old_major_version == 1:
+            _LOGGER.info("Migrating onboard manager storage to version 2")
+            return migrate_v1_to_v2(old_data)
+        return old_data
+
+
 class OnboardStorage:
-    """Handle persistent storage for onboard manager."""
+    """
+    Handle persistent storage for onboard manager.
+
+    Users are held as UserRecord objects and only converted from and to
+    their stored form when loading and saving. Every change is recorded in
+    the change log, whose revision is persisted with the data.
+
+    Roles are stored in the users document, or in a document of their own
+    when split_sections is set, so that each section is only written when
+    it changed.
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    Each config entry has its own documents. Versions before multi-entry
+    support used a single set of documents without the entry ID, which is
+    taken over by the first entry (migrate_legacy).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        save_delay: float = DEFAULT_SAVE_DELAY_SECONDS,
+        split_sections: bool = DEFAULT_SPLIT_STORAGE,
+        migrate_legacy: bool = False,
+    ) -> None:
         """Initialize storage."""
         self.hass = hass
-        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._store = OnboardStore(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}")
+        self._roles_store = Store(
+            hass, ROLES_STORAGE_VERSION, f"{ROLES_STORAGE_KEY}.{entry_id}"
+        )
+        self._migrate_legacy = migrate_legacy
         self._data: dict[str, Any] = {"roles": [], "users": {}}
+        self._dirty_sections: set[str] = set()
+        self.save_delay = save_delay
+        self.split_sections = split_sections
+        self.changes = ChangeLog()
+        # Time spent building the JSON form for the last write
+        self.last_serialize_ms: float | None = None
+        self._aggregates: Aggregates | None = None
+        self._aggregates_revision: int | None = None
 
     async def async_load(self) -> dict[str, Any]:
         """Load data from storage."""
         data = await self._store.async_load()
-        if data is None:
-            data = {"roles": [], "users": {}}
-        self._data = data
+        roles_store = self._roles_store
+        legacy_stores: tuple[Store, Store] | None = None
+        if data is None and self._migrate_legacy:
+            legacy_stores = (
+                OnboardStore(self.hass, STORAGE_VERSION, STORAGE_KEY),
+                Store(self.hass, ROLES_STORAGE_VERSION, ROLES_STORAGE_KEY),
+            )
+            data = await legacy_stores[0].async_load()
+            roles_store = legacy_stores[1]
+
+        data = data or {}
+        revision = data.get("revision", 0)
+        if "roles" in data:
+            roles = data["roles"]
+        else:
+            # Split layout (or no data yet)
+            roles_data = await roles_store.async_load() or {}
+            roles = roles_data.get("roles", [])
+            revision = max(revision, roles_data.get("revision", 0))
+        self.changes = ChangeLog(revision)
+        self._data = {"roles": roles, "users": decode_users(data)}
+        # Aggregates are saved along with the users they were computed from
+        self._aggregates = decode_aggregates(data)
+        self._aggregates_revision = data.get("revision", 0)
+
+        if legacy_stores is not None and (data or roles):
+            _LOGGER.info("Moving onboard manager storage to the config entry")
+            self._dirty_sections.update((SECTION_ROLES, SECTION_USERS))
+            await self.async_save()
+            for legacy_store in legacy_stores:
+                await legacy_store.async_remove()
         return self._data
 
+    async def async_remove(self) -> None:
+        """Remove the stored documents."""
+        await self._store.async_remove()
+        await self._roles_store.async_remove()
+
     async def async_save(self) -> None:
-        """Save data to storage."""
-        await self._store.async_save(self._data)
+        """Save data to storage immediately."""
+        if self.split_sections:
+            await self._roles_store.async_save(self._roles_to_save())
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule a delayed save of the changed sections.
+
+        Repeated calls within the delay are coalesced into a single write.
+        Pending writes are also flushed by the Store on Home Assistant stop.
+        """
+        if not self.split_sections:
+            if self._dirty_sections:
+                self._store.async_delay_save(self._data_to_save, self.save_delay)
+            return
+        if SECTION_USERS in self._dirty_sections:
+            self._store.async_delay_save(self._data_to_save, self.save_delay)
+        if SECTION_ROLES in self._dirty_sections:
+            self._roles_store.async_delay_save(self._roles_to_save, self.save_delay)
+
+    async def async_flush(self) -> None:
+        """Write pending changes to disk, if any."""
+        if self._dirty_sections:
+            await self.async_save()
+
+    async def async_set_split_sections(self, split_sections: bool) -> None:
+        """Switch between the single document and the per-section layout."""
+        if split_sections == self.split_sections:
+            return
+        self.split_sections = split_sections
+        await self.async_save()
+        if not split_sections:
+            await self._roles_store.async_remove()
+
+    @property
+    def dirty(self) -> bool:
+        """Return True if there are changes not yet written to disk."""
+        return bool(self._dirty_sections)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the users document for a save and clear its dirty flag."""
+        self._dirty_sections.discard(SECTION_USERS)
+        if not self.split_sections:
+            self._dirty_sections.discard(SECTION_ROLES)
+        return self._serialize_for_save()
+
+    @callback
+    def _roles_to_save(self) -> dict[str, Any]:
+        """Return the roles document for a save and clear its dirty flag."""
+        self._dirty_sections.discard(SECTION_ROLES)
+        return self._serialize_roles()
+
+    def _serialize_roles(self) -> dict[str, Any]:
+        """Return the stored form of the roles document."""
+        return {"revision": self.changes.revision, "roles": self.get_roles()}
+
+    def _serialize(self) -> dict[str, Any]:
+        """Return the stored form of the users document."""
+        data = encode_users(
+            self.get_users(), self.changes.revision, self.cached_aggregates
+        )
+        if not self.split_sections:
+            data["roles"] = self.get_roles()
+        return data
+
+    def _serialize_for_save(self) -> dict[str, Any]:
+        """Return the stored form of the users document, timing the conversion."""
+        started = time.perf_counter()
+        data = self._serialize()
+        self.last_serialize_ms = round((time.perf_counter() - started) * 1000, 3)
+        return data
+
+    def document_size(self) -> int:
+        """Return the size in bytes of the stored JSON documents."""
+        size = len(json_bytes(self._serialize()))
+        if self.split_sections:
+            size += len(json_bytes(self._serialize_roles()))
+        return size
+
+    @property
+    def cached_aggregates(self) -> Aggregates | None:
+        """Return the aggregates if they were computed from the current data."""
+        if self._aggregates_revision != self.changes.revision:
+            return None
+        return self._aggregates
+
+    @callback
+    def set_aggregates(
+        self, active_all: list[str], active_by_role: dict[str, list[str]]
+    ) -> None:
+        """Cache the aggregates computed from the current data for the next save."""
+        self._aggregates = (active_all, active_by_role)
+        self._aggregates_revision = self.changes.revision
+
+    def _record_change(self, user_id: str | None) -> None:
+        """Record a change of a user (None for the roles) and mark it unsaved."""
+        self.changes.record(user_id)
+        self._dirty_sections.add(SECTION_ROLES if user_id is None else SECTION_USERS)
 
     def get_data(self) -> dict[str, Any]:
         """Get current data."""
         return self._data
 
+    @property
+    def revision(self) -> int:
+        """Return the revision of the data."""
+        return self.changes.revision
+
+    @property
+    def epoch(self) -> str:
+        """Return the epoch the revision belongs to, new after every load."""
+        return self.changes.epoch
+
     def update_data(self, data: dict[str, Any]) -> None:
-        """Update data."""
+        """Update data.
+
+        Callers pass a new users dict, so changed records are found by
+        identity.
+        """
+        if data.get("roles", []) != self._data.get("roles", []):
+            self._record_change(None)
+        old_users = self._data.get("users", {})
+        new_users = data.get("users", {})
+        for user_id in old_users:
+            if user_id not in new_users:
+                self._record_change(user_id)
+        for user_id, user in new_users.items():
+            if old_users.get(user_id) is not user:
+                self._record_change(user_id)
         self._data = data
 
     def get_roles(self) -> list[dict[str, str]]:
@@ -48,30 +392,150 @@ class OnboardStorage:
     def set_roles(self, roles: list[dict[str, str]]) -> None:
         """Set roles."""
         self._data["roles"] = roles
+        self._record_change(None)
 
-    def get_users(self) -> dict[str, dict[str, Any]]:
+    def get_users(self) -> dict[str, UserRecord]:
         """Get all user data."""
         return self._data.get("users", {})
 
-    def get_user(self, user_id: str) -> dict[str, Any] | None:
+    def get_user(self, user_id: str) -> UserRecord | None:
         """Get a specific user."""
         return self._data.get("users", {}).get(user_id)
 
-    def set_user(self, user_id: str, user_data: dict[str, Any]) -> None:
+    def set_user(self, user_id: str, user: UserRecord) -> None:
         """Set user data."""
         if "users" not in self._data:
             self._data["users"] = {}
-        self._data["users"][user_id] = user_data
+        self._data["users"][user_id] = user
+        self._record_change(user_id)
 
     def delete_user(self, user_id: str) -> None:
         """Delete a user."""
         if "users" in self._data and user_id in self._data["users"]:
             del self._data["users"][user_id]
+            self._record_change(user_id)
 
-    def update_user(self, user_id: str, updates: dict[str, Any]) -> None:
-        """Update specific fields of a user."""
-        if "users" not in self._data:
-            self._data["users"] = {}
-        if user_id not in self._data["users"]:
-            self._data["users"][user_id] = {}
-        self._data["users"][user_id].update(updates)
+    def update_user(self, user_id: str, updates: dict[str, Any]) -> bool:
+        """Update specific fields of a user, returning False if it is unknown.
+
+        Records are immutable, so callers holding the previous record can
+        diff against it. Users are only added by the user sync, so an unknown
+        user is not created here.
+        """
+        users = self._data.get("users", {})
+        current = users.get(user_id)
+        if current is None:
+            _LOGGER.warning(f"Not updating unknown user {user_id}")
+            return False
+        users[user_id] = replace(current, **updates)
+        self._record_change(user_id)
+        return True
+
+
+class DeadLetterStore:
+    """
+    Persistent store of notifications that could not be delivered.
+
+    Letters are kept in the order they failed; when the store is full the
+    oldest letter is dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        save_delay: float = DEFAULT_SAVE_DELAY_SECONDS,
+        migrate_legacy: bool = False,
+    ) -> None:
+        """Initialize storage."""
+        self.hass = hass
+        self._store = Store(
+            hass, DEAD_LETTER_STORAGE_VERSION, f"{DEAD_LETTER_STORAGE_KEY}.{entry_id}"
+        )
+        self._migrate_legacy = migrate_legacy
+        self._letters: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self.save_delay = save_delay
+
+    def __len__(self) -> int:
+        """Return the number of dead letters."""
+        return len(self._letters)
+
+    async def async_load(self) -> None:
+        """Load dead letters from storage."""
+        data = await self._store.async_load()
+        if data is None and self._migrate_legacy:
+            legacy_store = Store(
+                self.hass, DEAD_LETTER_STORAGE_VERSION, DEAD_LETTER_STORAGE_KEY
+            )
+            if (data := await legacy_store.async_load()) is not None:
+                await self._store.async_save(data)
+                await legacy_store.async_remove()
+        letters = data.get("letters", []) if data else []
+        self._letters = {letter["id"]: letter for letter in letters}
+
+    async def async_remove(self) -> None:
+        """Remove the stored dead letters."""
+        await self._store.async_remove()
+
+    async def async_flush(self) -> None:
+        """Write pending changes to disk, if any."""
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data for a delayed save and clear the dirty flag."""
+        self._dirty = False
+        return {"letters": list(self._letters.values())}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Mark data dirty and schedule a delayed save."""
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, self.save_delay)
+
+    def get_letters(self) -> list[dict[str, Any]]:
+        """Get all dead letters, oldest first."""
+        return list(self._letters.values())
+
+    @callback
+    def async_add(
+        self,
+        notifier: str,
+        group: str,
+        service_data: dict[str, Any],
+        attempts: int,
+    ) -> dict[str, Any]:
+        """Add a notification that could not be delivered."""
+        letter = {
+            "id": ulid_now(),
+            "notifier": notifier,
+            "group": group,
+            "service_data": service_data,
+            "attempts": attempts,
+            "failed_at": dt_util.utcnow().isoformat(),
+        }
+        self._letters[letter["id"]] = letter
+        while len(self._letters) > MAX_DEAD_LETTERS:
+            oldest = next(iter(self._letters))
+            _LOGGER.warning(f"Dead letter store full, dropping {oldest}")
+            del self._letters[oldest]
+        self._async_schedule_save()
+        return letter
+
+    @callback
+    def async_pop(self, letter_ids: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """Remove and return the given dead letters (all if None)."""
+        if letter_ids is None:
+            letters = list(self._letters.values())
+            self._letters.clear()
+        else:
+            letters = [
+                letter
+                for letter_id in letter_ids
+                if (letter := self._letters.pop(letter_id, None)) is not None
+            ]
+        if letters:
+            self._async_schedule_save()
+        return letters
@@ -11,7 +11,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, ENTITY_PREFIX
-from .coordinator import OnboardManagerCoordinator
+from .coordinator import OnboardManagerCoordinator, user_context
+from .entity import async_remove_entities, async_remove_orphaned_entities
 from .user_registry import get_short_id
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,39 +28,46 @@ async def async_setup_entry(
         "coordinator"
     ]
 
-    entities: list[SwitchEntity] = []
+    # Entities keyed by user_id, touched only on additions/removals
+    user_switches: dict[str, list[SwitchEntity]] = {}
 
     # Create per-user switches
-    for user_id, user_data in coordinator.data["users"].items():
-        entities.append(OnboardSwitch(coordinator, config_entry, user_id))
-        entities.append(NotifySwitch(coordinator, config_entry, user_id))
-
+    for user_id in coordinator.data["users"]:
+        user_switches[user_id] = [
+            OnboardSwitch(coordinator, config_entry, user_id),
+            NotifySwitch(coordinator, config_entry, user_id),
+        ]
+
+    entities = [entity for switches in user_switches.values() for entity in switches]
+    async_remove_orphaned_entities(hass, config_entry, "switch", entities)
     async_add_entities(entities)
 
     # Register platform update callback to handle user additions/removals
     @callback
     def async_add_remove_entities() -> None:
         """Add or remove entities based on coordinator data."""
-        current_users = coordinator.data.get("users", {})
-
-        # Get existing entity user IDs
-        existing_user_ids = {
-            entity.user_id
-            for entity in entities
-            if hasattr(entity, "user_id")
-        }
-
-        new_entities = []
+        data = coordinator.data
+        new_entities: list[SwitchEntity] = []
+        removed_entities: list[SwitchEntity] = []
 
         # Add switches for new users
-        for user_id in current_users:
-            if user_id not in existing_user_ids:
-                new_entities.append(OnboardSwitch(coordinator, config_entry, user_id))
-                new_entities.append(NotifySwitch(coordinator, config_entry, user_id))
+        for user_id in data.get("added_user_ids", ()):
+            if user_id not in user_switches:
+                user_switches[user_id] = [
+                    OnboardSwitch(coordinator, config_entry, user_id),
+                    NotifySwitch(coordinator, config_entry, user_id),
+                ]
+                new_entities.extend(user_switches[user_id])
+
+        # Remove switches of deleted users
+        for user_id in data.get("removed_user_ids", ()):
+            if user_id in user_switches:
+                removed_entities.extend(user_switches.pop(user_id))
 
         if new_entities:
             async_add_entities(new_entities)
-            entities.extend(new_entities)
+        if removed_entities:
+            async_remove_entities(hass, removed_entities)
 
     # Listen for coordinator updates
     config_entry.async_on_unload(
@@ -77,7 +85,7 @@ class OnboardSwitch(CoordinatorEntity, SwitchEntity):
         user_id: str,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=user_context(user_id))
         self.user_id = user_id
         self._attr_has_entity_name = False
 
@@ -97,18 +105,18 @@ class OnboardSwitch(CoordinatorEntity, SwitchEntity):
 
     def _update_attrs(self) -> None:
         """Update switch attributes."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             # User no longer exists
             self._attr_available = False
             return
 
         self._attr_available = True
-        name = user_data.get("name", "Unknown")
+        name = user.name
 
         self._attr_name = f"{name} Onboard"
-        self._attr_is_on = user_data.get("onboard", False)
+        self._attr_is_on = user.onboard
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
@@ -129,7 +137,7 @@ class NotifySwitch(CoordinatorEntity, SwitchEntity):
         user_id: str,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=user_context(user_id))
         self.user_id = user_id
         self._attr_has_entity_name = False
 
@@ -149,18 +157,18 @@ class NotifySwitch(CoordinatorEntity, SwitchEntity):
 
     def _update_attrs(self) -> None:
         """Update switch attributes."""
-        user_data = self.coordinator.data["users"].get(self.user_id, {})
+        user = self.coordinator.data["users"].get(self.user_id)
 
-        if not user_data:
+        if user is None:
             # User no longer exists
             self._attr_available = False
             return
 
         self._attr_available = True
-        name = user_data.get("name", "Unknown")
+        name = user.name
 
         self._attr_name = f"Notify {name}"
-        self._attr_is_on = user_data.get("notify", True)
+        self._attr_is_on = user.notify
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
@@ -1,6 +1,9 @@
 """User registry and sync for Onboard Manager."""
 from __future__ import annotations
 
+from bisect import bisect_right, insort
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
 import logging
 from typing import Any
 
@@ -8,6 +11,7 @@ from homeassistant.auth.models import User
 from homeassistant.core import HomeAssistant
 
 from .const import DEFAULT_NOTIFY, DEFAULT_NOTIFIERS, DEFAULT_ONBOARD
+from .models import RoleCatalog, UserRecord
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,31 +44,52 @@ def parse_notifiers_input(notifiers: Any) -> list[str]:
     return [normalize_notifier(n) for n in notifier_list]
 
 
+def is_ha_user(user: User | None) -> bool:
+    """Return True if a Home Assistant user should be managed."""
+    # Filter out system users and get only human users
+    return user is not None and not user.system_generated and user.is_active
+
+
 async def get_ha_users(hass: HomeAssistant) -> list[User]:
     """Get all human Home Assistant users."""
     users = await hass.auth.async_get_users()
-    # Filter out system users and get only human users
-    return [user for user in users if not user.system_generated and user.is_active]
+    return [user for user in users if is_ha_user(user)]
+
+
+def create_user_record(user: User, default_role: str) -> UserRecord:
+    """Create the default record for a new Home Assistant user."""
+    user_name = user.name or "Unknown"
+    _LOGGER.info(f"Creating new user record for {user_name} ({user.id})")
+    return UserRecord(
+        user_id=user.id,
+        name=user_name,
+        onboard=DEFAULT_ONBOARD,
+        notify=DEFAULT_NOTIFY,
+        role=default_role,
+        notifiers=tuple(DEFAULT_NOTIFIERS),
+    )
 
 
 async def sync_users(
     hass: HomeAssistant,
-    storage_users: dict[str, dict[str, Any]],
-    roles: list[dict[str, str]],
-) -> tuple[dict[str, dict[str, Any]], set[str]]:
+    storage_users: dict[str, UserRecord],
+    role_catalog: RoleCatalog,
+) -> tuple[dict[str, UserRecord], set[str]]:
     """
     Sync Home Assistant users with storage.
 
+    Unchanged records are reused as they are, since records are immutable.
+
     Returns:
         Tuple of (updated_users_dict, set_of_removed_user_ids)
     """
     ha_users = await get_ha_users(hass)
     ha_user_ids = {user.id for user in ha_users}
 
-    # Default role slug (first role)
-    default_role = roles[0]["slug"] if roles else "default"
+    # New users get the default role of the catalog
+    default_role = role_catalog.default_slug
 
-    updated_users: dict[str, dict[str, Any]] = {}
+    updated_users: dict[str, UserRecord] = {}
     removed_user_ids: set[str] = set()
 
     # Process existing HA users
@@ -74,19 +99,12 @@ async def sync_users(
 
         if user_id in storage_users:
             # Existing user - update name if changed
-            user_data = storage_users[user_id].copy()
-            user_data["name"] = user_name
+            user_data = storage_users[user_id]
+            if user_data.name != user_name:
+                user_data = replace(user_data, name=user_name)
         else:
             # New user - create default record
-            _LOGGER.info(f"Creating new user record for {user_name} ({user_id})")
-            user_data = {
-                "user_id": user_id,
-                "name": user_name,
-                "onboard": DEFAULT_ONBOARD,
-                "notify": DEFAULT_NOTIFY,
-                "role": default_role,
-                "notifiers": DEFAULT_NOTIFIERS.copy(),
-            }
+            user_data = create_user_record(user, default_role)
 
         updated_users[user_id] = user_data
 
@@ -94,65 +112,314 @@ async def sync_users(
     for stored_user_id in storage_users:
         if stored_user_id not in ha_user_ids:
             removed_user_ids.add(stored_user_id)
-            _LOGGER.info(f"Removing user {storage_users[stored_user_id].get('name', stored_user_id)}")
+            _LOGGER.info(f"Removing user {storage_users[stored_user_id].name}")
 
     return updated_users, removed_user_ids
 
 
-def compute_active_notifiers(users: dict[str, dict[str, Any]]) -> list[str]:
+class ActiveNotifierIndex:
     """
-    Compute list of active notifiers from all users.
+    Reference-counted index of the notifiers of active users.
 
-    Active user = onboard == True AND notify == True
+    Keeps notifier -> active-user count, both overall and per role, together
+    with the contribution of each user, so a single user change only touches
+    the notifiers that were actually added or removed. Output lists keep the
+    order in which notifiers first became active and are only rebuilt when a
+    notifier enters or leaves them.
     """
-    notifiers_set = []
-    seen = set()
-
-    for user_data in users.values():
-        if user_data.get("onboard", False) and user_data.get("notify", True):
-            for notifier in user_data.get("notifiers", []):
-                if notifier not in seen:
-                    notifiers_set.append(notifier)
-                    seen.add(notifier)
-
-    return notifiers_set
-
 
-def compute_active_notifiers_by_role(
-    users: dict[str, dict[str, Any]],
-) -> dict[str, list[str]]:
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._contributions: dict[str, tuple[str, tuple[str, ...]]] = {}
+        self._all: dict[str, int] = {}
+        self._by_role: dict[str, dict[str, int]] = {}
+        self._role_users: dict[str, int] = {}
+        self._all_list: list[str] | None = []
+        self._by_role_lists: dict[str, list[str]] = {}
+        self._dirty_roles: set[str] = set()
+
+    @staticmethod
+    def _contribution(
+        user: UserRecord | None,
+    ) -> tuple[str, tuple[str, ...]] | None:
+        """Return the (role, notifiers) a user adds to the index, if active."""
+        if user is None or not user.is_active:
+            return None
+        return user.role, tuple(dict.fromkeys(user.notifiers))
+
+    @staticmethod
+    def _increment(counts: dict[str, int], notifiers: Iterable[str]) -> bool:
+        """Increment counts, returning True if a notifier was added."""
+        added = False
+        for notifier in notifiers:
+            count = counts.get(notifier, 0)
+            counts[notifier] = count + 1
+            if not count:
+                added = True
+        return added
+
+    @staticmethod
+    def _decrement(counts: dict[str, int], notifiers: Iterable[str]) -> bool:
+        """Decrement counts, returning True if a notifier was dropped."""
+        dropped = False
+        for notifier in notifiers:
+            count = counts[notifier] - 1
+            if count:
+                counts[notifier] = count
+            else:
+                del counts[notifier]
+                dropped = True
+        return dropped
+
+    def _join_role(self, role: str, notifiers: tuple[str, ...]) -> None:
+        """Add an active user's notifiers to a role."""
+        if not role:
+            return
+        if role not in self._by_role:
+            self._by_role[role] = {}
+            self._role_users[role] = 0
+            self._dirty_roles.add(role)
+        self._role_users[role] += 1
+        if self._increment(self._by_role[role], notifiers):
+            self._dirty_roles.add(role)
+
+    def _leave_role(self, role: str, notifiers: tuple[str, ...]) -> None:
+        """Remove an active user's notifiers from a role."""
+        if not role:
+            return
+        if self._decrement(self._by_role[role], notifiers):
+            self._dirty_roles.add(role)
+        self._role_users[role] -= 1
+        if not self._role_users[role]:
+            del self._by_role[role]
+            del self._role_users[role]
+            self._dirty_roles.add(role)
+
+    def update_user(self, user_id: str, user: UserRecord | None) -> bool:
+        """
+        Apply the current state of a user (None if removed) to the index.
+
+        Returns True if the user's contribution changed.
+        """
+        old = self._contributions.get(user_id)
+        new = self._contribution(user)
+        if old == new:
+            return False
+
+        if new is None:
+            del self._contributions[user_id]
+        else:
+            self._contributions[user_id] = new
+
+        old_role, old_notifiers = old if old is not None else (None, ())
+        new_role, new_notifiers = new if new is not None else (None, ())
+        old_set = set(old_notifiers)
+        new_set = set(new_notifiers)
+        removed = [n for n in old_notifiers if n not in new_set]
+        added = [n for n in new_notifiers if n not in old_set]
+
+        if self._decrement(self._all, removed) | self._increment(self._all, added):
+            self._all_list = None
+
+        if old_role == new_role:
+            counts = self._by_role.get(old_role) if old_role else None
+            if counts is not None and (
+                self._decrement(counts, removed) | self._increment(counts, added)
+            ):
+                self._dirty_roles.add(old_role)
+        else:
+            if old_role is not None:
+                self._leave_role(old_role, old_notifiers)
+            if new_role is not None:
+                self._join_role(new_role, new_notifiers)
+
+        return True
+
+    def sync(self, users: dict[str, UserRecord]) -> bool:
+        """
+        Bring the index in line with a full set of users.
+
+        Returns True if any contribution changed.
+        """
+        changed = False
+        for user_id in [u for u in self._contributions if u not in users]:
+            changed |= self.update_user(user_id, None)
+        for user_id, user in users.items():
+            changed |= self.update_user(user_id, user)
+        return changed
+
+    @property
+    def active_notifiers_all(self) -> list[str]:
+        """Return the deduplicated notifiers of all active users."""
+        if self._all_list is None:
+            self._all_list = list(self._all)
+        return self._all_list
+
+    @property
+    def active_notifiers_by_role(self) -> dict[str, list[str]]:
+        """Return the deduplicated notifiers of active users per role."""
+        if self._dirty_roles:
+            by_role = dict(self._by_role_lists)
+            for role in self._dirty_roles:
+                if role in self._by_role:
+                    by_role[role] = list(self._by_role[role])
+                else:
+                    by_role.pop(role, None)
+            self._by_role_lists = by_role
+            self._dirty_roles.clear()
+        return self._by_role_lists
+
+
+class UserNameIndex:
     """
-    Compute active notifiers grouped by role.
+    Case-insensitive index of user names to user IDs.
 
-    Active user = onboard == True AND notify == True
+    Display names are not unique in Home Assistant, so each name maps to a
+    set of user IDs and callers must handle more than one match.
     """
-    by_role: dict[str, list[str]] = {}
-
-    for user_data in users.values():
-        if user_data.get("onboard", False) and user_data.get("notify", True):
-            role = user_data.get("role", "")
-            if role:
-                if role not in by_role:
-                    by_role[role] = []
 
-                for notifier in user_data.get("notifiers", []):
-                    if notifier not in by_role[role]:
-                        by_role[role].append(notifier)
-
-    return by_role
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._user_ids: dict[str, set[str]] = {}
+        self._keys: dict[str, str] = {}
+
+    def update_user(self, user_id: str, name: str | None) -> None:
+        """Index the current name of a user (None if removed)."""
+        key = name.casefold() if name else None
+        old_key = self._keys.get(user_id)
+        if key == old_key:
+            return
+
+        if old_key is not None:
+            user_ids = self._user_ids[old_key]
+            user_ids.discard(user_id)
+            if not user_ids:
+                del self._user_ids[old_key]
+            del self._keys[user_id]
+
+        if key is not None:
+            self._user_ids.setdefault(key, set()).add(user_id)
+            self._keys[user_id] = key
+
+    def sync(self, users: dict[str, UserRecord]) -> None:
+        """Bring the index in line with a full set of users."""
+        for user_id in [u for u in self._keys if u not in users]:
+            self.update_user(user_id, None)
+        for user_id, user in users.items():
+            self.update_user(user_id, user.name)
+
+    def lookup(self, username: str) -> set[str]:
+        """Return the IDs of all users with the given name."""
+        return self._user_ids.get(username.casefold(), set())
+
+
+class UserAttributeIndex:
+    """
+    Index of user IDs by role, onboard and notify state.
 
+    Filtered queries intersect the ID sets of the requested values, smallest
+    first, instead of scanning all users. All user IDs are also kept in
+    sorted order for paging.
+    """
 
-async def resolve_user_id(
-    hass: HomeAssistant, user_id: str | None = None, username: str | None = None
+    FIELDS = ("role", "onboard", "notify")
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._user_ids: dict[tuple[str, Any], set[str]] = {}
+        self._keys: dict[str, tuple[tuple[str, Any], ...]] = {}
+        self._sorted_ids: list[str] = []
+
+    def update_user(self, user_id: str, user: UserRecord | None) -> None:
+        """Index the current state of a user (None if removed)."""
+        keys = (
+            None
+            if user is None
+            else tuple((field, getattr(user, field)) for field in self.FIELDS)
+        )
+        old_keys = self._keys.get(user_id)
+        if keys == old_keys:
+            return
+
+        if old_keys is None:
+            insort(self._sorted_ids, user_id)
+        else:
+            for key in old_keys:
+                user_ids = self._user_ids[key]
+                user_ids.discard(user_id)
+                if not user_ids:
+                    del self._user_ids[key]
+            del self._keys[user_id]
+
+        if keys is None:
+            del self._sorted_ids[bisect_right(self._sorted_ids, user_id) - 1]
+            return
+        for key in keys:
+            self._user_ids.setdefault(key, set()).add(user_id)
+        self._keys[user_id] = keys
+
+    def sync(self, users: dict[str, UserRecord]) -> None:
+        """Bring the index in line with a full set of users."""
+        for user_id in [u for u in self._keys if u not in users]:
+            self.update_user(user_id, None)
+        for user_id, user in users.items():
+            self.update_user(user_id, user)
+
+    def select(
+        self,
+        criteria: Mapping[str, Any],
+        user_ids: Iterable[str] | None = None,
+    ) -> list[str]:
+        """
+        Return the sorted IDs of users matching all criteria.
+
+        Criteria map fields of FIELDS to the required value; user_ids
+        restricts the result to the given users. The returned list may be
+        the index's own and must not be modified.
+        """
+        candidates = [
+            self._user_ids.get((field, value), set())
+            for field, value in criteria.items()
+        ]
+        if user_ids is not None:
+            candidates.append({u for u in user_ids if u in self._keys})
+        if not candidates:
+            return self._sorted_ids
+        candidates.sort(key=len)
+        return sorted(candidates[0].intersection(*candidates[1:]))
+
+
+class AmbiguousUsernameError(ValueError):
+    """A username matches several users."""
+
+    def __init__(self, username: str, user_ids: Iterable[str]) -> None:
+        """Initialize with the matching user IDs."""
+        self.user_ids = sorted(user_ids)
+        super().__init__(
+            f"Username {username} matches several users "
+            f"({', '.join(self.user_ids)}), use user_id instead"
+        )
+
+
+def resolve_user_id(
+    name_index: UserNameIndex,
+    user_id: str | None = None,
+    username: str | None = None,
 ) -> str | None:
-    """Resolve user_id from either user_id or username."""
+    """
+    Resolve user_id from either user_id or username.
+
+    Returns None if no user matches, and raises AmbiguousUsernameError if
+    the username matches several users.
+    """
     if user_id:
         return user_id
 
     if username:
-        users = await hass.auth.async_get_users()
-        for user in users:
-            if user.name and user.name.lower() == username.lower():
-                return user.id
+        user_ids = name_index.lookup(username)
+        if len(user_ids) == 1:
+            return next(iter(user_ids))
+        if user_ids:
+            raise AmbiguousUsernameError(username, user_ids)
 
     return None
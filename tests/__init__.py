@@ -0,0 +1 @@
+"""Tests for the Onboard Manager integration."""
@@ -0,0 +1,172 @@
+"""Tests for the Onboard Manager notification dispatcher."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.onboard_manager.const import (
+    CONF_DUPLICATE_WINDOW,
+    DEFAULT_DUPLICATE_WINDOW_SECONDS,
+    DOMAIN,
+    MAX_DELIVERY_ATTEMPTS,
+)
+from custom_components.onboard_manager.dispatch import (
+    GROUP_ALL,
+    NotifyDispatcher,
+    message_key,
+)
+from custom_components.onboard_manager.storage import DeadLetterStore
+
+NOTIFIERS = ["notify.phone"]
+
+
+def make_dispatcher(
+    hass: HomeAssistant, options: dict[str, Any] | None = None
+) -> NotifyDispatcher:
+    """Create a dispatcher for a config entry with the given options."""
+    config_entry = MockConfigEntry(domain=DOMAIN, options=options or {})
+    config_entry.add_to_hass(hass)
+    return NotifyDispatcher(
+        hass, config_entry, DeadLetterStore(hass, config_entry.entry_id)
+    )
+
+
+def test_message_key_ignores_data_order() -> None:
+    """Test that the key of a message doesn't depend on the order of its data."""
+    first = {"message": "Hi", "data": {"tag": "a", "actions": [{"action": "OK"}]}}
+    second = {"message": "Hi", "data": {"actions": [{"action": "OK"}], "tag": "a"}}
+
+    assert message_key(first, "normal") == message_key(second, "normal")
+    assert message_key(first, "normal") != message_key(
+        {**first, "data": {"tag": "b"}}, "normal"
+    )
+
+
+async def test_duplicates_are_not_suppressed_by_default(hass: HomeAssistant) -> None:
+    """Test that repeated messages are all delivered without a duplicate window."""
+    assert DEFAULT_DUPLICATE_WINDOW_SECONDS == 0
+    calls = async_mock_service(hass, "notify", "phone")
+    dispatcher = make_dispatcher(hass)
+
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm")
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm")
+
+    assert len(calls) == 2
+    assert dispatcher.suppressed == 0
+
+
+async def test_duplicate_to_same_target_is_suppressed(hass: HomeAssistant) -> None:
+    """Test that a repeated message within the window is dropped."""
+    calls = async_mock_service(hass, "notify", "phone")
+    dispatcher = make_dispatcher(hass, {CONF_DUPLICATE_WINDOW: 30})
+
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm", target="anna")
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm", target="anna")
+
+    assert len(calls) == 1
+    assert dispatcher.suppressed == 1
+
+
+async def test_message_to_different_target_is_not_suppressed(
+    hass: HomeAssistant,
+) -> None:
+    """Test that the same message to another target is delivered."""
+    calls = async_mock_service(hass, "notify", "phone")
+    dispatcher = make_dispatcher(hass, {CONF_DUPLICATE_WINDOW: 30})
+
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm", target="anna")
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm", target="ben")
+
+    assert [call.data["target"] for call in calls] == ["anna", "ben"]
+    assert dispatcher.suppressed == 0
+
+
+def register_failing_notifier(
+    hass: HomeAssistant, error: Exception
+) -> list[ServiceCall]:
+    """Register notify.phone, failing every call with the given error."""
+    calls: list[ServiceCall] = []
+
+    async def _async_fail(call: ServiceCall) -> None:
+        calls.append(call)
+        raise error
+
+    hass.services.async_register("notify", "phone", _async_fail)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "error", [HomeAssistantError("Gateway offline"), TimeoutError()]
+)
+async def test_transient_failure_is_retried(
+    hass: HomeAssistant, error: Exception
+) -> None:
+    """Test that a delivery failing with a transient error is retried later."""
+    calls = register_failing_notifier(hass, error)
+    dispatcher = make_dispatcher(hass)
+
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm")
+
+    assert len(calls) == 1
+    assert dispatcher.retry_depth == 1
+    assert len(dispatcher.dead_letters) == 0
+    dispatcher.async_shutdown()
+
+
+async def test_transient_failure_is_dead_lettered_after_last_attempt(
+    hass: HomeAssistant,
+) -> None:
+    """Test that a delivery still failing on its last attempt is dead-lettered."""
+    register_failing_notifier(hass, HomeAssistantError("Gateway offline"))
+    dispatcher = make_dispatcher(hass)
+
+    await dispatcher._async_attempt(
+        GROUP_ALL,
+        ("notify", "phone"),
+        {"message": "Anchor alarm"},
+        10,
+        MAX_DELIVERY_ATTEMPTS,
+    )
+
+    assert dispatcher.retry_depth == 0
+    assert dispatcher.dead_letters.get_letters()[0]["attempts"] == (
+        MAX_DELIVERY_ATTEMPTS
+    )
+
+
+async def test_missing_notifier_is_dead_lettered_without_retry(
+    hass: HomeAssistant,
+) -> None:
+    """Test that a delivery to a notify service that doesn't exist isn't retried."""
+    dispatcher = make_dispatcher(hass)
+
+    await dispatcher.async_send(GROUP_ALL, ["notify.missing"], "Anchor alarm")
+
+    assert dispatcher.retry_depth == 0
+    letters = dispatcher.dead_letters.get_letters()
+    assert [(letter["notifier"], letter["attempts"]) for letter in letters] == [
+        ("notify.missing", 1)
+    ]
+
+
+async def test_invalid_message_is_dead_lettered_without_retry(
+    hass: HomeAssistant,
+) -> None:
+    """Test that a message the notifier rejects as invalid isn't retried."""
+    calls = register_failing_notifier(hass, vol.Invalid("Unknown key 'push'"))
+    dispatcher = make_dispatcher(hass)
+
+    await dispatcher.async_send(GROUP_ALL, NOTIFIERS, "Anchor alarm")
+
+    assert len(calls) == 1
+    assert dispatcher.retry_depth == 0
+    assert len(dispatcher.dead_letters) == 1
@@ -0,0 +1,303 @@
+"""Tests for the Onboard Manager storage."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.onboard_manager.const import (
+    ROLES_STORAGE_KEY,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from custom_components.onboard_manager.models import (
+    FLAG_NOTIFY,
+    FLAG_ONBOARD,
+    UserRecord,
+)
+from custom_components.onboard_manager.storage import (
+    OnboardStorage,
+    decode_aggregates,
+    decode_users,
+    encode_users,
+    migrate_v1_to_v2,
+)
+
+ENTRY_ID = "test_entry"
+USERS_KEY = f"{STORAGE_KEY}.{ENTRY_ID}"
+ROLES_KEY = f"{ROLES_STORAGE_KEY}.{ENTRY_ID}"
+
+ROLES = [
+    {"label": "Crew", "slug": "crew"},
+    {"label": "Guest", "slug": "guest"},
+]
+
+# Version 1 document: users as full dicts, notifiers repeated per user
+V1_DATA: dict[str, Any] = {
+    "revision": 7,
+    "roles": ROLES,
+    "users": {
+        "anna": {
+            "name": "Anna",
+            "onboard": True,
+            "notify": True,
+            "role": "crew",
+            "notifiers": ["notify.mobile_app_anna", "notify.telegram_crew"],
+        },
+        "ben": {
+            "name": "Ben",
+            "onboard": False,
+            "notify": True,
+            "role": "guest",
+            "notifiers": ["notify.telegram_crew", "notify.mobile_app_ben"],
+        },
+        "carla": {
+            "name": "Carla",
+            "onboard": True,
+            "notify": False,
+            "role": "crew",
+            "notifiers": [],
+        },
+    },
+}
+
+V1_USERS = {
+    user_id: UserRecord.from_dict(user_id, user_data)
+    for user_id, user_data in V1_DATA["users"].items()
+}
+
+
+def test_migrate_v1_to_v2_rows() -> None:
+    """Test that a version 1 document is converted to compact rows."""
+    data = migrate_v1_to_v2(V1_DATA)
+
+    assert data["revision"] == 7
+    assert data["roles"] == ROLES
+    # Shared notifiers are stored once
+    assert data["notifiers"] == [
+        "notify.mobile_app_anna",
+        "notify.telegram_crew",
+        "notify.mobile_app_ben",
+    ]
+    assert data["users"] == {
+        "anna": ["Anna", FLAG_ONBOARD | FLAG_NOTIFY, "crew", [0, 1]],
+        "ben": ["Ben", FLAG_NOTIFY, "guest", [1, 2]],
+        "carla": ["Carla", FLAG_ONBOARD, "crew", []],
+    }
+
+
+def test_migrate_v1_to_v2_keeps_settings() -> None:
+    """Test that role, flags and notifier order survive the migration."""
+    users = decode_users(migrate_v1_to_v2(V1_DATA))
+
+    assert users == V1_USERS
+    assert users["ben"].notifiers == ("notify.telegram_crew", "notify.mobile_app_ben")
+    assert users["carla"].onboard and not users["carla"].notify
+
+
+def test_encode_decode_users_round_trip() -> None:
+    """Test that encoded users decode to equal records."""
+    users = {
+        "anna": UserRecord("anna", "Anna", True, True, "crew", ("notify.b", "notify.a")),
+        "ben": UserRecord("ben", "Ben", False, False, "guest", ("notify.a",)),
+        "carla": UserRecord("carla", "Carla", True, False, "crew", ()),
+    }
+
+    data = encode_users(users, 3)
+
+    assert data["revision"] == 3
+    assert data["notifiers"] == ["notify.b", "notify.a"]
+    assert decode_users(data) == users
+    assert decode_aggregates(data) is None
+
+
+def test_encode_decode_aggregates_round_trip() -> None:
+    """Test that aggregates are stored as notifier indexes and decoded."""
+    aggregates = (
+        ["notify.a", "notify.c"],
+        {"crew": ["notify.a"], "guest": ["notify.c"]},
+    )
+    users = {"anna": UserRecord("anna", "Anna", notifiers=("notify.a",))}
+
+    data = encode_users(users, 1, aggregates)
+
+    # Notifiers only used by the aggregates are added to the table
+    assert data["notifiers"] == ["notify.a", "notify.c"]
+    assert data["aggregates"] == {"all": [0, 1], "by_role": {"crew": [0], "guest": [1]}}
+    assert decode_aggregates(data) == aggregates
+
+
+async def test_store_migrates_v1_document(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that a stored version 1 document is loaded and saved as version 2."""
+    hass_storage[USERS_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": USERS_KEY,
+        "data": V1_DATA,
+    }
+
+    storage = OnboardStorage(hass, ENTRY_ID)
+    await storage.async_load()
+
+    assert storage.get_users() == V1_USERS
+    assert storage.get_roles() == ROLES
+    assert storage.revision == 7
+
+    await storage.async_save()
+
+    stored = hass_storage[USERS_KEY]
+    assert stored["version"] == STORAGE_VERSION
+    assert stored["data"]["users"]["ben"] == ["Ben", FLAG_NOTIFY, "guest", [1, 2]]
+    assert stored["data"]["roles"] == ROLES
+    assert ROLES_KEY not in hass_storage
+
+
+async def test_split_storage_writes_roles_document(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that split storage keeps the roles in a document of their own."""
+    hass_storage[USERS_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": USERS_KEY,
+        "data": V1_DATA,
+    }
+
+    storage = OnboardStorage(hass, ENTRY_ID, split_sections=True)
+    await storage.async_load()
+    await storage.async_save()
+
+    assert "roles" not in hass_storage[USERS_KEY]["data"]
+    assert hass_storage[ROLES_KEY]["data"] == {"revision": 7, "roles": ROLES}
+
+    # Roles are read back from their own document
+    reloaded = OnboardStorage(hass, ENTRY_ID, split_sections=True)
+    await reloaded.async_load()
+    assert reloaded.get_roles() == ROLES
+    assert reloaded.get_users() == V1_USERS
+
+    # Switching back moves the roles into the users document
+    await reloaded.async_set_split_sections(False)
+    assert hass_storage[USERS_KEY]["data"]["roles"] == ROLES
+    assert ROLES_KEY not in hass_storage
+
+
+async def test_legacy_document_moves_to_first_entry(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that the single-entry document is taken over once and removed."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": V1_DATA,
+    }
+
+    # Other entries start empty and leave the legacy document alone
+    other = OnboardStorage(hass, "other_entry")
+    await other.async_load()
+    assert other.get_users() == {}
+    assert STORAGE_KEY in hass_storage
+
+    storage = OnboardStorage(hass, ENTRY_ID, migrate_legacy=True)
+    await storage.async_load()
+
+    assert storage.get_users() == V1_USERS
+    assert storage.get_roles() == ROLES
+    assert storage.revision == 7
+    assert STORAGE_KEY not in hass_storage
+    stored = hass_storage[USERS_KEY]
+    assert stored["version"] == STORAGE_VERSION
+    assert stored["data"]["users"]["ben"] == ["Ben", FLAG_NOTIFY, "guest", [1, 2]]
+
+    # Once the entry has its own document, a legacy document is ignored
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {"revision": 1, "roles": [], "users": {}},
+    }
+    reloaded = OnboardStorage(hass, ENTRY_ID, migrate_legacy=True)
+    await reloaded.async_load()
+    assert reloaded.get_users() == V1_USERS
+    assert STORAGE_KEY in hass_storage
+
+
+async def test_cached_aggregates_need_matching_revision(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that stored aggregates are ignored unless their revision matches."""
+    aggregates = (["notify.mobile_app_anna"], {"crew": ["notify.mobile_app_anna"]})
+    users_data = encode_users(V1_USERS, 5, aggregates)
+    hass_storage[USERS_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": USERS_KEY,
+        "data": {**users_data, "roles": ROLES},
+    }
+
+    storage = OnboardStorage(hass, ENTRY_ID)
+    await storage.async_load()
+    assert storage.cached_aggregates == aggregates
+
+    # Any change makes them stale
+    storage.update_user("anna", {"onboard": False})
+    assert storage.cached_aggregates is None
+
+    # A roles document newer than the users document makes them stale too
+    hass_storage[USERS_KEY]["data"] = users_data
+    hass_storage[ROLES_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": ROLES_KEY,
+        "data": {"revision": 6, "roles": ROLES},
+    }
+    split = OnboardStorage(hass, ENTRY_ID, split_sections=True)
+    await split.async_load()
+    assert split.revision == 6
+    assert decode_aggregates(users_data) == aggregates
+    assert split.cached_aggregates is None
+
+
+async def test_update_user_ignores_unknown_user(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that updating an unknown user does not create it."""
+    storage = OnboardStorage(hass, ENTRY_ID)
+    await storage.async_load()
+    storage.update_data({"roles": ROLES, "users": dict(V1_USERS)})
+    revision = storage.revision
+
+    assert not storage.update_user("unknown", {"onboard": True})
+    assert storage.get_user("unknown") is None
+    assert storage.revision == revision
+
+    assert storage.update_user("ben", {"onboard": True})
+    assert storage.get_user("ben").onboard
+    assert storage.revision == revision + 1
+
+
+async def test_revision_reused_after_crash_has_new_epoch(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test that a revision handed out again after an unsaved change is told apart."""
+    hass_storage[USERS_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": USERS_KEY,
+        "data": V1_DATA,
+    }
+    storage = OnboardStorage(hass, ENTRY_ID)
+    await storage.async_load()
+    storage.update_user("anna", {"onboard": False})
+    assert storage.revision == 8
+
+    # The delayed save never ran, so a restart hands out revision 8 again
+    restarted = OnboardStorage(hass, ENTRY_ID)
+    await restarted.async_load()
+    restarted.update_user("ben", {"onboard": True})
+
+    assert restarted.revision == 8
+    assert restarted.epoch != storage.epoch